@@ -24,6 +24,7 @@ CI = os.environ.get("CI", "0") in {"1", "true", "yes", ""}
 WINDOWS = os.name == "nt"
 PTY = not WINDOWS and not CI
 MULTIRUN = os.environ.get("MULTIRUN", "0") == "1"
+BENCHMARKS_STORAGE = Path(".benchmarks")
 
 
 def pyprefix(title: str) -> str:
@@ -193,3 +194,33 @@ def test(ctx: Context, *cli_args: str, match: str = "") -> None:
         ).add_args("-n", "auto", *cli_args),
         title=pyprefix("Running tests"),
     )
+
+
+@duty
+def benchmark(ctx: Context, *cli_args: str, match: str = "", save: bool = False, fail: str = "min:10%") -> None:
+    """Run the benchmarks, comparing the results with the last saved baseline.
+
+    Baselines are stored in the `.benchmarks` directory, for each machine and Python version.
+
+    Parameters:
+        match: A pytest expression to filter selected benchmarks.
+        save: Whether to save the results as the new baseline.
+        fail: Fail when a statistic regressed by more than a threshold compared to the baseline, like `min:10%`.
+    """
+    args = ["--no-cov", "-p", "no:randomly", "--benchmark-storage", str(BENCHMARKS_STORAGE)]
+    if any(BENCHMARKS_STORAGE.rglob("*.json")):
+        args.append("--benchmark-compare")
+        if fail:
+            args.append(f"--benchmark-compare-fail={fail}")
+    if save:
+        args.append("--benchmark-autosave")
+    ctx.run(
+        tools.pytest(
+            "tests/benchmarks",
+            config_file="config/pytest.ini",
+            select=match,
+            color="yes",
+        ).add_args(*args, *cli_args),
+        title=pyprefix("Running benchmarks"),
+        capture=False,
+    )
@@ -7,8 +7,16 @@ from mkdocstrings_handlers.zig._internal.config import (
     ZigOptions,
 )
 from mkdocstrings_handlers.zig._internal.handler import ZigHandler, get_handler
+from mkdocstrings_handlers.zig._internal.nodes import Const, Field, Fields, Function, Member, Module, Struct
 
 __all__ = [
+    "Const",
+    "Field",
+    "Fields",
+    "Function",
+    "Member",
+    "Module",
+    "Struct",
     "ZigConfig",
     "ZigHandler",
     "ZigInputConfig",
@@ -0,0 +1,103 @@
+# Persistent on-disk cache of extracted documentation.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+
+from mkdocstrings import get_logger
+
+_logger = get_logger(__name__)
+
+_CACHE_FORMAT = "6"
+"""Version of the cache layout, bump it when the stored data changes shape."""
+
+_MAX_ENTRY_AGE = 30 * 24 * 60 * 60
+"""Seconds after which entries that were neither read nor written are deleted."""
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class _DocsCache:
+    """Cache of extracted module docs, stored as JSON files keyed by source content."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        # Any change of the handler or of the grammar invalidates every entry.
+        self._salt = "\0".join(
+            (
+                _CACHE_FORMAT,
+                _package_version("mkdocstrings-zig"),
+                _package_version("tree-sitter"),
+                _package_version("tree-sitter-zig"),
+            ),
+        ).encode("utf-8")
+
+    def key(self, code: bytes) -> str:
+        """Compute the cache key of a source file content."""
+        return hashlib.sha256(self._salt + b"\0" + code).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        """Return cached docs, or `None` on a cache miss."""
+        path = self._entry_path(key)
+        try:
+            with path.open(encoding="utf-8") as file:
+                docs = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            _logger.debug(f"Ignoring unreadable cache entry {key}: {error}")
+            return None
+        # Entries are pruned by modification time, read entries are kept.
+        try:
+            os.utime(path)
+        except OSError as error:
+            _logger.debug(f"Could not touch cache entry {key}: {error}")
+        return docs
+
+    def set(self, key: str, docs: dict) -> None:
+        """Store extracted docs in the cache."""
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so that readers never see partial entries.
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError as error:
+            _logger.debug(f"Could not write cache entry {key}: {error}")
+            return
+
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(docs, file)
+            os.replace(tmp_name, path)
+        except OSError as error:
+            _logger.debug(f"Could not write cache entry {key}: {error}")
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def prune(self, max_age: float = _MAX_ENTRY_AGE) -> None:
+        """Delete the entries neither read nor written for `max_age` seconds.
+
+        Entries of edited or deleted files, or written by other versions of the handler, are never read again.
+        Entries are not deleted as soon as a build doesn't read them, since partial builds and other sites
+        sharing the cache directory would then lose the entries of the files they don't parse.
+        """
+        expired = time.time() - max_age
+        for path in self.directory.glob("*/*.json"):
+            try:
+                if path.stat().st_mtime < expired:
+                    path.unlink(missing_ok=True)
+            except OSError as error:
+                _logger.debug(f"Could not prune cache entry {path.stem}: {error}")
@@ -103,6 +103,15 @@ class ZigInputOptions:
         ),
     ] = field(default_factory=dict)
 
+    follow_imports: Annotated[
+        bool,
+        _Field(
+            group="general",
+            description="Document the public declarations bound to imported Zig files, "
+            "or to their declarations, under their public names.",
+        ),
+    ] = False
+
     heading: Annotated[
         str,
         _Field(
@@ -180,6 +189,68 @@ class ZigInputConfig:
         _Field(description="Configuration options for collecting and rendering objects."),
     ] = field(default_factory=ZigInputOptions)
 
+    cache: Annotated[
+        bool,
+        _Field(description="Whether to cache extracted documentation on disk between builds."),
+    ] = False
+
+    cache_dir: Annotated[
+        str,
+        _Field(description="The cache directory, relative to the MkDocs configuration file."),
+    ] = ".cache/mkdocstrings-zig"
+
+    engine: Annotated[
+        Literal["walk", "query"],
+        _Field(description="The engine extracting docs: tree walk, or slower experimental queries."),
+    ] = "walk"
+
+    jobs: Annotated[
+        int,
+        _Field(
+            description="The number of worker processes parsing Zig files. Use 0 to use all available CPUs.",
+            ge=0,
+        ),
+    ] = 1
+
+    preload: Annotated[
+        bool | list[str],
+        _Field(
+            description="The identifiers to collect in one batch before rendering the first page: "
+            "`true` to find them in the Markdown files of the site, or a list of identifiers.",
+        ),
+    ] = False
+
+    streaming: Annotated[
+        bool,
+        _Field(description="Whether to parse and render the modules of directories one at a time, to bound memory."),
+    ] = False
+
+    discovery: Annotated[
+        Literal["files", "build"],
+        _Field(
+            description="How directories are searched: all the Zig files matching the `include` and `exclude` globs, "
+            "or the root source files of the modules of `build.zig` and the files they import.",
+        ),
+    ] = "files"
+
+    include: Annotated[
+        list[str],
+        _Field(description="Globs of the files to document in directories, relative to the directory."),
+    ] = field(default_factory=lambda: ["*.zig"])
+
+    exclude: Annotated[
+        list[str],
+        _Field(description="Globs of the files not to document in directories, relative to the directory."),
+    ] = field(default_factory=list)
+
+    inventories: Annotated[
+        list[str | dict[str, Any]],
+        _Field(
+            description="The inventories of other projects to load, as URLs or mappings with a `url` key "
+            "and optional `base_url` and `domains` keys.",
+        ),
+    ] = field(default_factory=list)
+
     @classmethod
     def coerce(cls, **data: Any) -> MutableMapping[str, Any]:
         """Coerce data."""
@@ -0,0 +1,68 @@
+# Discovery of the Zig files of directories.
+
+from __future__ import annotations
+
+import os
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+
+_EXCLUDED_DIRS = frozenset(("zig-cache", ".zig-cache", "zig-out"))
+"""Directories of build artifacts, never searched for Zig files."""
+
+# Like the mkdocstrings extension, with the indented options following the identifier.
+_AUTODOC_RE = re.compile(r"^(?:#{1,6} *)?::: ?(?P<name>.+?) *(?:\n|$)(?P<options>(?:[ \t]+.*(?:\n|$))*)", re.MULTILINE)
+_HANDLER_RE = re.compile(r"^\s*handler:\s*[\"']?(?P<handler>[\w-]+)", re.MULTILINE)
+
+
+def _matches(relative: PurePosixPath, include: list[str], exclude: list[str]) -> bool:
+    """Check if a path, relative to the searched directory, is included and not excluded."""
+    path = relative.as_posix()
+    return any(fnmatchcase(path, pattern) for pattern in include) and not any(
+        fnmatchcase(path, pattern) for pattern in exclude
+    )
+
+
+def _glob_modules(directory: Path, include: list[str], exclude: list[str]) -> list[Path]:
+    """Return the Zig files of a directory matching the globs, sorted.
+
+    Build artifacts, and directories whose contents are all excluded (like `vendor/*`), are not searched.
+    """
+    paths: list[Path] = []
+    for root, dirs, files in os.walk(directory):
+        relative_root = PurePosixPath(Path(root).relative_to(directory).as_posix())
+        dirs[:] = [
+            name
+            for name in dirs
+            if name not in _EXCLUDED_DIRS
+            and not any(fnmatchcase(f"{(relative_root / name).as_posix()}/", pattern) for pattern in exclude)
+        ]
+        paths.extend(
+            Path(root, name)
+            for name in files
+            if name.endswith(".zig") and _matches(relative_root / name, include, exclude)
+        )
+    return sorted(paths)
+
+
+def _find_build_file(directory: Path) -> Path | None:
+    """Return the `build.zig` file of the project containing a directory, if any."""
+    for parent in (directory, *directory.resolve().parents):
+        build_file = parent / "build.zig"
+        if build_file.is_file():
+            return build_file
+    return None
+
+
+def _find_identifiers(docs_dir: Path) -> list[str]:
+    """Return the identifiers of the `:::` blocks of the Markdown files of a site, in order of appearance.
+
+    Blocks selecting another handler are skipped, other blocks may not be Zig identifiers.
+    """
+    identifiers: dict[str, None] = {}
+    for path in sorted(docs_dir.rglob("*.md")):
+        for match in _AUTODOC_RE.finditer(path.read_text(encoding="utf-8")):
+            handler = _HANDLER_RE.search(match["options"])
+            if handler is None or handler["handler"] == "zig":
+                identifiers.setdefault(match["name"])
+    return list(identifiers)
@@ -2,25 +2,170 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import TYPE_CHECKING, Any, ClassVar
-
-import markdown
+import hashlib
+import json
+import os
+import posixpath
+import threading
+from copy import deepcopy
+from dataclasses import replace
+from functools import cached_property, partial
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any, BinaryIO, ClassVar
+
+from jinja2 import BytecodeCache
 from mkdocs.exceptions import PluginError
-from mkdocstrings import BaseHandler, CollectorItem, get_logger
+from mkdocstrings import BaseHandler, CollectionError, CollectorItem, Inventory, get_logger
 
+from mkdocstrings_handlers.zig._internal.cache import _DocsCache
 from mkdocstrings_handlers.zig._internal.config import ZigConfig, ZigOptions
-from mkdocstrings_handlers.zig._internal.zig_docs_extractor import _ZigDocsExtractor as ZigDocsExtractor
+from mkdocstrings_handlers.zig._internal.discovery import _find_build_file, _find_identifiers, _glob_modules, _matches
+from mkdocstrings_handlers.zig._internal.nodes import (
+    Const,
+    Fields,
+    Function,
+    Member,
+    Module,
+    Struct,
+    _iter_dotted_names,
+    _iter_rendered_members,
+    _node_to_rows,
+    _parsed_from_data,
+    _parsed_to_data,
+    _ParsedFile,
+    _Reexport,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping, MutableMapping
-
+    from collections.abc import Iterator, Mapping, MutableMapping
+    from concurrent.futures import ProcessPoolExecutor
+    from xml.etree.ElementTree import Element
+
+    from jinja2 import Template
+    from jinja2.bccache import Bucket
+    from markdown import Markdown
+    from markupsafe import Markup
     from mkdocs.config.defaults import MkDocsConfig
+    from mkdocs_autorefs import AutorefsHookInterface
     from mkdocstrings import HandlerOptions
 
+    from mkdocstrings_handlers.zig._internal.zig_docs_extractor import _ZigDocsExtractor
+
 
 _logger = get_logger(__name__)
 
+# `mkdocs serve` creates a new handler for each rebuild, so the previous parse of each file
+# is kept at the module level to reparse edited files incrementally.
+_previous_extractors: dict[Path, _ZigDocsExtractor] = {}
+
+# Incremental reparses edit the tree of the previous extractor, and extractors fill caches while
+# extracting docs, so each file is parsed by one thread at a time.
+_file_locks: dict[Path, threading.Lock] = {}
+
+
+def _file_lock(resolved: Path) -> threading.Lock:
+    # `setdefault` is atomic, so all threads get the same lock for a given file.
+    return _file_locks.setdefault(resolved, threading.Lock())
+
+
+# The HTML of each rendered module, with the headings registered while rendering it, is kept across rebuilds
+# so that `mkdocs serve` only renders again the modules whose docs or options changed.
+_rendered: dict[str, tuple[str, list[Element]]] = {}
+
+
+_MEMBER_TEMPLATES = {
+    "fields": "fields.html.jinja",
+    "const": "constant.html.jinja",
+    "struct": "struct.html.jinja",
+    "function": "function.html.jinja",
+}
+"""The template rendering each type of member of a structure."""
+
+
+class _MemoryBytecodeCache(BytecodeCache):
+    """Keep compiled templates in memory, to share them with the handlers of later builds."""
+
+    def __init__(self) -> None:
+        self._bytecodes: dict[str, bytes] = {}
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        bytecode = self._bytecodes.get(bucket.key)
+        if bytecode is not None:
+            bucket.bytecode_from_string(bytecode)
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        self._bytecodes[bucket.key] = bucket.bytecode_to_string()
+
+    def clear(self) -> None:
+        self._bytecodes.clear()
+
+
+_bytecode_cache = _MemoryBytecodeCache()
+
+
+def _resolve_reexport(reexport: _Reexport, module: Module) -> Const | Struct | Function | None:
+    """Return the docs of a re-exported file or declaration, under its public name."""
+    if not reexport.target:
+        return Struct(
+            name=reexport.name,
+            short_signature=reexport.short_signature,
+            doc=reexport.doc or module.doc,
+            children=module.children,
+        )
+
+    children = module.children
+    member: Const | Struct | Function | None = None
+    for name in reexport.target.split("."):
+        member = next((child for child in children if not isinstance(child, Fields) and child.name == name), None)
+        if member is None:
+            return None
+        children = member.children if isinstance(member, Struct) else []
+
+    if isinstance(member, (Const, Struct)):
+        return replace(
+            member,
+            name=reexport.name,
+            short_signature=reexport.short_signature,
+            doc=reexport.doc or member.doc,
+        )
+    # Functions keep their signature, which is the only place where their parameters are documented.
+    return replace(member, name=reexport.name, doc=reexport.doc or member.doc) if member else None
+
+
+def _find_member(module: Module, qualified_name: str) -> Member | None:
+    """Return the docs of a declaration of a module, given its dotted name, like extractors do."""
+    children = module.children
+    *parents, name = qualified_name.split(".")
+    for parent in parents:
+        struct = next((child for child in children if not isinstance(child, Fields) and child.name == parent), None)
+        if not isinstance(struct, Struct):
+            return None
+        children = struct.children
+
+    for child in children:
+        if isinstance(child, Fields):
+            member_field = next((member_field for member_field in child.children if member_field.name == name), None)
+            if member_field is not None:
+                return Fields(children=[member_field])
+        elif child.name == name:
+            return child
+    return None
+
+
+class _ModuleStream:
+    """The modules of a directory, parsed while they are iterated over and released right after."""
+
+    def __init__(self, handler: ZigHandler, paths: list[Path], *, follow_imports: bool = False) -> None:
+        self._handler = handler
+        self.paths = paths
+        self.follow_imports = follow_imports
+
+    def __iter__(self) -> Iterator[Module]:
+        return self._handler._iter_modules(self.paths, follow_imports=self.follow_imports)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
 
 class ZigHandler(BaseHandler):
     """The Zig handler class."""
@@ -33,20 +178,24 @@ class ZigHandler(BaseHandler):
     # Typically: the file extension, like `py`, `go` or `rs`.
     # For non-language handlers, use the technology/tool name, like `openapi` or `click`.
 
-    enable_inventory: ClassVar[bool] = False
+    enable_inventory: ClassVar[bool] = True
     """Whether this handler is interested in enabling the creation of the `objects.inv` Sphinx inventory file."""
 
     fallback_theme: ClassVar[str] = "material"
     """The theme to fallback to."""
 
-    def __init__(self, config: ZigConfig, base_dir: Path, **kwargs: Any) -> None:
+    def __init__(self, config: ZigConfig, base_dir: Path, docs_dir: Path | None = None, **kwargs: Any) -> None:
         """Initialize the handler.
 
         Parameters:
             config: The handler configuration.
             base_dir: The base directory of the project.
+            docs_dir: The directory of the Markdown files of the site, searched for identifiers to preload.
             **kwargs: Arguments passed to the parent constructor.
         """
+        # Pages can be rendered from several threads: each thread converts Markdown
+        # with its own Markdown instance, and gathers the headings of its own page.
+        self._local = threading.local()
         super().__init__(**kwargs)
 
         self.config = config
@@ -55,8 +204,63 @@ class ZigHandler(BaseHandler):
         """The base directory of the project."""
         self.global_options = config.options
         """The global configuration options."""
+        self.docs_dir = docs_dir
+        """The directory of the Markdown files of the site."""
+
+        # The identifiers of the anchors of the collected declarations, to resolve cross-references.
+        self._aliases: dict[str, tuple[str, ...]] = {}
+        self._modules: dict[Path, tuple[int, _ParsedFile]] = {}
+        self._followed: dict[Path, tuple[int, Module]] = {}
+        self._cache = _DocsCache(base_dir / config.cache_dir) if config.cache else None
+        # Without Pydantic, options are not validated when loaded.
+        if config.jobs < 0:
+            raise PluginError(f"Invalid number of jobs {config.jobs}, use a positive number, or 0 for all CPUs")
+        self._jobs = config.jobs or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+        self._converted: dict[tuple[str, str, int, str, bool], Markup] = {}
+        self._preload_lock = threading.Lock()
+        self._preloaded = not config.preload
+        self._rendered_keys: set[str] = set()
+        self._parsed_paths: set[Path] = set()
+        self._env_lock = threading.Lock()
+        self._env_updated = False
+
+    @cached_property
+    def _extractor(self) -> type[_ZigDocsExtractor]:
+        # The Zig grammar and tree-sitter are loaded on first collection, not when the handler is imported,
+        # so that builds without Zig pages don't pay for them.
+        from mkdocstrings_handlers.zig._internal.zig_docs_extractor import _EXTRACTORS  # noqa: PLC0415
+
+        if self.config.engine not in _EXTRACTORS:
+            raise PluginError(f"Unknown extraction engine '{self.config.engine}', use one of: {', '.join(_EXTRACTORS)}")
+        return _EXTRACTORS[self.config.engine]
+
+    @property
+    def _md(self) -> Markdown | None:
+        # Set by `_update_env`, which the mkdocstrings extension calls in the thread rendering the page.
+        return getattr(self._local, "md", None)
+
+    @_md.setter
+    def _md(self, md: Markdown | None) -> None:
+        self._local.md = md
+
+    @property
+    def _headings(self) -> list[Element]:
+        try:
+            return self._local.headings
+        except AttributeError:
+            self._local.headings = []
+            return self._local.headings
 
-        self._collected: dict[str, CollectorItem] = {}
+    @_headings.setter
+    def _headings(self, headings: list[Element]) -> None:
+        self._local.headings = headings
+
+    @property
+    def outer_layer(self) -> bool:
+        """Whether we're in the outer Markdown conversion layer of the current thread."""
+        return getattr(self._local, "layer", 0) == 0
 
     def get_options(self, local_options: Mapping[str, Any]) -> HandlerOptions:
         """Get combined default, global and local options.
@@ -77,50 +281,442 @@ class ZigHandler(BaseHandler):
         except Exception as error:
             raise PluginError(f"Invalid options: {error}") from error
 
-    def collect(self, identifier: str, options: ZigOptions) -> CollectorItem:  # noqa: ARG002
-        """Collect data given an identifier and selection configuration."""
-        path = Path(identifier)
-        if path.is_dir():
-            modules = []
-            for p in sorted(path.rglob("*.zig")):
-                modules.append(self._parse_module(p))
+    def collect(self, identifier: str, options: ZigOptions) -> CollectorItem:
+        """Collect data given an identifier and selection configuration.
+
+        The identifier is the path of a Zig file or of a directory of Zig files.
+        A single declaration of a file can be selected with its dotted name after `::`,
+        like `src/root.zig::Point.x`.
+        """
+        if not self._preloaded:
+            self._preload()
+
+        file_path, _, qualified_name = identifier.partition("::")
+        path = Path(file_path)
+        if qualified_name:
+            modules = [self._parse_member(path, qualified_name)]
+        elif path.is_dir():
+            paths = self._find_modules(path)
+            if self.config.streaming:
+                # Modules are parsed lazily, while the root template renders them one by one.
+                return _ModuleStream(self, paths, follow_imports=options.follow_imports)
+            if self._jobs > 1:
+                self._prefetch_modules(paths)
+            modules = [self._parse_module(p) for p in paths]
         else:
             modules = [self._parse_module(path)]
+        if options.follow_imports and not qualified_name:
+            modules = [self._follow_imports(module) for module in modules]
 
+        for module in modules:
+            self._index_module(module)
         return modules
 
-    @staticmethod
-    def _parse_module(path: Path) -> dict:
-        code = path.read_text(encoding="utf-8")
-        parsed = ZigDocsExtractor(code).get_docs()
-        parsed["path"] = str(path)
-        parsed["name"] = str(path)
+    def _preload(self) -> None:
+        """Parse the files of all the identifiers of the site at once, so that collecting them only reads the memo.
+
+        Files are parsed in worker processes when several jobs are configured.
+        """
+        with self._preload_lock:
+            if self._preloaded:
+                return
+            if isinstance(self.config.preload, list):
+                identifiers = self.config.preload
+            elif self.docs_dir is not None:
+                identifiers = _find_identifiers(self.docs_dir)
+            else:
+                identifiers = []
+
+            paths: dict[Path, None] = {}
+            for identifier in identifiers:
+                file_path, _, qualified_name = identifier.partition("::")
+                path = Path(file_path)
+                if path.is_file() and path.suffix == ".zig":
+                    paths[path] = None
+                elif path.is_dir() and not qualified_name and not self.config.streaming:
+                    # Streamed directories are parsed while rendered, to bound memory.
+                    paths.update(dict.fromkeys(self._find_modules(path)))
+            _logger.debug("Preloading %d Zig files", len(paths))
+            if self._jobs > 1:
+                self._prefetch_modules(list(paths))
+            for path in paths:
+                self._parse_module(path)
+            self._preloaded = True
+
+    def _index_module(self, module: Module) -> None:
+        """Register the aliases of the anchors of the declarations rendered for a module.
+
+        Anchors are the identifiers selecting the declarations, like `src/root.zig::Point.x`.
+        Each declaration is also known by its fully qualified Zig name, starting with the name of the file,
+        like `root.Point.x`.
+        Files with the same name give the same qualified names, which autorefs reports as ambiguous.
+        """
+        path = module.path
+        module_name = Path(path).stem
+        if module.member is None:
+            self._aliases[path] = (module_name,)
+            children, prefix = module.children, ""
+        else:
+            namespace = module.name.rpartition(".")[0]
+            children, prefix = [module.member], f"{namespace}." if namespace else ""
+        for dotted_name in _iter_dotted_names(children, prefix):
+            self._aliases[f"{path}::{dotted_name}"] = (f"{module_name}.{dotted_name}",)
+
+    def _parse_module(self, path: Path) -> Module:
+        docs = self._parse_file(path.resolve()).docs
+        return replace(docs, path=str(path), name=str(path))
+
+    def _parse_file(self, resolved: Path) -> _ParsedFile:
+        # The same file can be reached through several identifiers (a directory and one of its files,
+        # or different spellings of the same path), so parse results are memoized by resolved path.
+        self._parsed_paths.add(resolved)
+        mtime, parsed = self._get_memoized(resolved)
+        if parsed is None:
+            with _file_lock(resolved):
+                # Another thread may have parsed the file while this one was waiting.
+                mtime, parsed = self._get_memoized(resolved)
+                if parsed is None:
+                    code = resolved.read_text(encoding="utf-8")
+                    parsed = self._get_cached(code)
+                    if parsed is None:
+                        parsed = self._get_extractor(resolved, code).get_parsed_file()
+                        self._set_cached(code, parsed)
+                    self._modules[resolved] = (mtime, parsed)
         return parsed
 
+    def _iter_modules(self, paths: list[Path], *, follow_imports: bool = False) -> Iterator[Module]:
+        # Files are prefetched by windows of a few files per worker, to keep the workers busy.
+        window = self._jobs * 4 if self._jobs > 1 else 1
+        for start in range(0, len(paths), window):
+            batch = paths[start : start + window]
+            if self._jobs > 1:
+                self._prefetch_modules(batch)
+            for path in batch:
+                module = self._parse_module(path)
+                if follow_imports:
+                    module = self._follow_imports(module)
+                # Forget the docs and the syntax tree of the module, so that memory stays bounded.
+                resolved = path.resolve()
+                self._modules.pop(resolved, None)
+                _previous_extractors.pop(resolved, None)
+                self._index_module(module)
+                yield module
+
+    def _follow_imports(self, module: Module) -> Module:
+        followed, _ = self._get_followed_module(Path(module.path).resolve(), ())
+        return replace(module, children=followed.children, fingerprint=followed.fingerprint)
+
+    def _get_followed_module(self, resolved: Path, importers: tuple[Path, ...]) -> tuple[Module, bool]:
+        """Return the docs of a file, including the declarations it re-exports from the files it imports.
+
+        Imported files are resolved once, even when imported from many files. Re-exports leading back
+        to one of the importers are skipped: the returned flag is false when some were, and the docs
+        are then only memoized once resolved from the file taking part in the cycle that was collected.
+        """
+        mtime = resolved.stat().st_mtime_ns
+        followed = self._followed.get(resolved)
+        if followed is not None and followed[0] == mtime:
+            return followed[1], True
+
+        # Re-exports are read from the extracted docs, and the imported files are parsed together.
+        docs, _, reexports = self._parse_file(resolved)
+        imported_paths = [(resolved.parent / reexport.path).resolve() for reexport in reexports]
+        if self._jobs > 1:
+            self._prefetch_modules([imported for imported in imported_paths if imported.is_file()])
+        resolved_members: list[Const | Struct | Function] = []
+        # The docs depend on the documented surface of the file and of the files they re-export from.
+        fingerprint = hashlib.sha256(docs.fingerprint.encode("utf-8"))
+        complete = True
+        for reexport, imported in zip(reexports, imported_paths):
+            if imported == resolved or imported in importers:
+                complete = False
+                continue
+            if not imported.is_file():
+                _logger.debug("Could not find %s, imported by %s", reexport.path, resolved)
+                continue
+            imported_docs, imported_complete = self._get_followed_module(imported, (*importers, resolved))
+            complete = complete and imported_complete
+            fingerprint.update(b"\0" + imported_docs.fingerprint.encode("utf-8"))
+            member = _resolve_reexport(reexport, imported_docs)
+            if member is not None:
+                resolved_members.append(member)
+
+        # Documented re-exports of declarations were extracted as constants, which the resolved docs replace.
+        # Re-exports are documented after the declarations of the file, in source order.
+        names = {member.name for member in resolved_members}
+        children = [child for child in docs.children if not isinstance(child, Const) or child.name not in names]
+        followed_docs = replace(docs, children=[*children, *resolved_members], fingerprint=fingerprint.hexdigest())
+        if complete or not importers:
+            self._followed[resolved] = (mtime, followed_docs)
+        return followed_docs, complete
+
+    def _parse_member(self, path: Path, qualified_name: str) -> Module:
+        resolved = path.resolve()
+        # When the whole file was already collected, the declaration is found in its docs.
+        _, parsed = self._get_memoized(resolved)
+        if parsed is not None:
+            member = _find_member(parsed.docs, qualified_name)
+        else:
+            with _file_lock(resolved):
+                member = self._get_extractor(resolved).get_member_docs(qualified_name)
+        if member is None:
+            raise CollectionError(f"Could not find a documented declaration '{qualified_name}' in {path}")
+        return Module(path=str(path), name=qualified_name, member=member)
+
+    def _get_extractor(self, resolved: Path, code: str | None = None) -> _ZigDocsExtractor:
+        # The parse tree is shared by all the identifiers targeting the same file, and by the discovery of files.
+        # Callers hold the lock of the file.
+        self._parsed_paths.add(resolved)
+        if code is None:
+            code = resolved.read_text(encoding="utf-8")
+        extractor = _previous_extractors.get(resolved)
+        if extractor is None or extractor.code != code.encode("utf-8"):
+            extractor = self._extractor(code, previous=extractor)
+            _previous_extractors[resolved] = extractor
+        return extractor
+
+    def _find_modules(self, directory: Path) -> list[Path]:
+        """Return the Zig files to document in a directory."""
+        include, exclude = self.config.include, self.config.exclude
+        if self.config.discovery == "build":
+            build_file = _find_build_file(directory)
+            if build_file is not None:
+                root = directory.resolve()
+                paths = []
+                for reachable in self._find_reachable_modules(build_file):
+                    if reachable.is_relative_to(root):
+                        relative = PurePosixPath(reachable.relative_to(root).as_posix())
+                        if _matches(relative, include, exclude):
+                            paths.append(directory / relative)
+                return sorted(paths)
+            _logger.debug("No build.zig found for %s, searching all of its Zig files", directory)
+        return _glob_modules(directory, include, exclude)
+
+    def _find_reachable_modules(self, build_file: Path) -> set[Path]:
+        """Return the resolved paths of the root source files of a `build.zig` file, and of the files they import.
+
+        Files are parsed level by level, in worker processes when several jobs are configured,
+        and their imports are read from their memoized or cached docs.
+        """
+        build_file = build_file.resolve()
+        with _file_lock(build_file):
+            pending = [build_file.parent / root for root in self._get_extractor(build_file).get_root_source_files()]
+        reachable: set[Path] = set()
+        while pending:
+            level = list(dict.fromkeys(path.resolve() for path in pending))
+            level = [resolved for resolved in level if resolved not in reachable and resolved.is_file()]
+            reachable.update(level)
+            if self._jobs > 1:
+                self._prefetch_modules(level)
+            pending = [
+                resolved.parent / imported for resolved in level for imported in self._parse_file(resolved).imports
+            ]
+        return reachable
+
+    def _prefetch_modules(self, paths: list[Path]) -> None:
+        """Extract docs of the given files in worker processes, filling the memo used by `_parse_module`."""
+        pending = []
+        for path in paths:
+            resolved = path.resolve()
+            mtime, parsed = self._get_memoized(resolved)
+            if parsed is not None or resolved in _previous_extractors:
+                # Files that were parsed before are reparsed incrementally by `_parse_module`.
+                continue
+            code = resolved.read_text(encoding="utf-8")
+            parsed = self._get_cached(code)
+            if parsed is None:
+                pending.append((resolved, mtime, code))
+            else:
+                self._modules[resolved] = (mtime, parsed)
+
+        if len(pending) < 2:  # noqa: PLR2004
+            return
+
+        # Worker processes are only needed with several jobs, their modules are imported when first started.
+        from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+        from multiprocessing import get_context  # noqa: PLC0415
+
+        from mkdocstrings_handlers.zig._internal.zig_docs_extractor import _extract_docs  # noqa: PLC0415
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._jobs, mp_context=get_context("spawn"))
+        chunksize = max(1, len(pending) // (self._jobs * 4))
+        codes = [code for _, _, code in pending]
+        # `map` yields results in submission order, so the output stays deterministic.
+        for (resolved, mtime, code), data in zip(
+            pending,
+            self._executor.map(partial(_extract_docs, engine=self.config.engine), codes, chunksize=chunksize),
+        ):
+            parsed = _parsed_from_data(data)
+            self._set_cached(code, parsed)
+            self._modules[resolved] = (mtime, parsed)
+
+    def _get_memoized(self, resolved: Path) -> tuple[int, _ParsedFile | None]:
+        mtime = resolved.stat().st_mtime_ns
+        memoized = self._modules.get(resolved)
+        if memoized is not None and memoized[0] == mtime:
+            return mtime, memoized[1]
+        return mtime, None
+
+    def _get_cached(self, code: str) -> _ParsedFile | None:
+        if self._cache is None:
+            return None
+        cached = self._cache.get(self._cache.key(code.encode("utf-8")))
+        return None if cached is None else _parsed_from_data(cached)
+
+    def _set_cached(self, code: str, parsed: _ParsedFile) -> None:
+        if self._cache is not None:
+            self._cache.set(self._cache.key(code.encode("utf-8")), _parsed_to_data(parsed))
+
     def render(self, data: CollectorItem, options: ZigOptions) -> str:
-        """Render a template using provided data and configuration options."""
-        # The `data` argument is the data to render, that was collected above in `collect()`.
-        # The `options` argument is the configuration options for loading/rendering the data.
-        # It contains both the global and local options, combined together.
+        """Render a template using provided data and configuration options.
 
-        # You might want to get the template based on the data type.
+        Each module is rendered on its own, and unless streaming, its HTML is reused by later renders and builds
+        as long as its docs, the options, the templates and the page being rendered are the same.
+        """
         template = self.env.get_template("root.html.jinja")
-        # All the following variables will be available in the Jinja templates.
-        return template.render(
-            config=options,
-            data=data,  # You might want to rename `data` into something more specific.
-            heading_level=options.heading_level,
-            root=True,
-        )
+        page = self._get_current_page()
+        return "".join(self._render_module(template, module, options, page) for module in data)
+
+    def _render_module(self, template: Template, module: Module, options: ZigOptions, page: str) -> str:
+        if self.config.streaming:
+            # Keeping the HTML and headings of every module would defeat streaming, which bounds memory.
+            return template.render(config=options, data=[module], heading_level=options.heading_level, root=True)
+        # Whole files are identified by the fingerprint of their documented surface, without serializing their docs.
+        # Single declarations have no fingerprint, and are small.
+        surface = module.fingerprint or json.dumps(_node_to_rows(module))
+        key = hashlib.sha256(
+            b"\0".join(
+                (
+                    self._render_salt,
+                    module.path.encode("utf-8"),
+                    module.name.encode("utf-8"),
+                    surface.encode("utf-8"),
+                    repr(options).encode("utf-8"),
+                    page.encode("utf-8"),
+                ),
+            ),
+        ).hexdigest()
+        self._rendered_keys.add(key)
+        rendered = _rendered.get(key)
+        if rendered is None:
+            headings = len(self._headings)
+            html = template.render(config=options, data=[module], heading_level=options.heading_level, root=True)
+            # Headings are moved to the page by the mkdocstrings extension, so copies are kept.
+            rendered = (html, [deepcopy(heading) for heading in self._headings[headings:]])
+            _rendered[key] = rendered
+        else:
+            self._headings.extend(deepcopy(heading) for heading in rendered[1])
+        return rendered[0]
+
+    @cached_property
+    def _render_salt(self) -> bytes:
+        # Custom templates and Markdown extensions can change between the builds of `mkdocs serve`.
+        digest = hashlib.sha256()
+        for name in self.env.list_templates(extensions=["jinja"]):
+            digest.update(self.env.loader.get_source(self.env, name)[0].encode("utf-8"))  # type: ignore[union-attr]
+        extensions = [
+            extension if isinstance(extension, str) else type(extension).__name__ for extension in self.mdx or ()
+        ]
+        digest.update(repr((extensions, self.mdx_config)).encode("utf-8"))
+        return digest.digest()
+
+    def _get_current_page(self) -> str:
+        # Relative links in docs are converted for the page being rendered, by the `relpath` processor of MkDocs.
+        relpath = self.md.treeprocessors["relpath"] if "relpath" in self.md.treeprocessors else None  # noqa: SIM401
+        return getattr(getattr(relpath, "file", None), "src_uri", "")
+
+    def do_convert_markdown(
+        self,
+        text: str,
+        heading_level: int,
+        html_id: str = "",
+        *,
+        strip_paragraph: bool = False,
+        autoref_hook: AutorefsHookInterface | None = None,
+    ) -> Markup:
+        """Render Markdown text with the Markdown instance of the handler, memoizing the result.
+
+        The same docs often appear many times (like the docs of fields with the same name),
+        so identical conversions are done once per page, as relative links depend on the page.
 
-    def get_aliases(self, identifier: str) -> tuple[str, ...]:
-        """Get aliases for a given identifier."""
+        Parameters:
+            text: The text to convert.
+            heading_level: The base heading level to start all Markdown headings from.
+            html_id: The HTML id of the element that's considered the parent of this element.
+            strip_paragraph: Whether to exclude the `<p>` tag from around the whole output.
+            autoref_hook: The hook to use for cross-references, if any.
+
+        Returns:
+            An HTML string.
+        """
+        if autoref_hook is not None:
+            return self._convert_markdown(text, heading_level, html_id, strip_paragraph, autoref_hook)
+
+        key = (self._get_current_page(), text, heading_level, html_id, strip_paragraph)
+        html = self._converted.get(key)
+        if html is None:
+            headings = len(self._headings)
+            html = self._convert_markdown(text, heading_level, html_id, strip_paragraph)
+            # Headings are registered during the conversion, for the table of contents of the page.
+            # Docs with headings are therefore converted each time they are rendered.
+            if len(self._headings) == headings:
+                self._converted[key] = html
+        return html
+
+    def _convert_markdown(
+        self,
+        text: str,
+        heading_level: int,
+        html_id: str,
+        strip_paragraph: bool,  # noqa: FBT001
+        autoref_hook: AutorefsHookInterface | None = None,
+    ) -> Markup:
+        # The conversion layer of the parent class is shared by all threads, so it is tracked per thread here.
+        layer = getattr(self._local, "layer", 0)
+        self._local.layer = layer + 1
         try:
-            data = self._collected[identifier]
-        except KeyError:
-            return ()
-        # Update the following code to return the canonical identifier and any aliases.
-        return (data.path,)
+            return super().do_convert_markdown(
+                text,
+                heading_level,
+                html_id,
+                strip_paragraph=strip_paragraph,
+                autoref_hook=autoref_hook,
+            )
+        finally:
+            self._local.layer = layer
+
+    def teardown(self) -> None:
+        """Shut down the worker processes, if any were started, and forget what this build did not use.
+
+        The HTML of modules not rendered by this build is forgotten, with the parse trees and locks
+        of files not parsed by this build, so that deleted or excluded files don't stay in memory.
+        Entries of the disk cache unused for a month are deleted.
+        """
+        if self._cache is not None:
+            self._cache.prune()
+        for key in _rendered.keys() - self._rendered_keys:
+            _rendered.pop(key, None)
+        for resolved in _previous_extractors.keys() - self._parsed_paths:
+            _previous_extractors.pop(resolved, None)
+        for resolved in _file_locks.keys() - self._parsed_paths:
+            # Locks held by another build are kept, that build still relies on them.
+            lock = _file_locks.get(resolved)
+            if lock is not None and not lock.locked():
+                _file_locks.pop(resolved, None)
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def get_aliases(self, identifier: str) -> tuple[str, ...]:
+        """Get aliases for a given identifier.
+
+        The identifier is the anchor of a rendered declaration, like `src/root.zig::Point.x`.
+        Its alias is its fully qualified Zig name, like `root.Point.x`.
+        """
+        return self._aliases.get(identifier, ())
 
     def update_env(self, config: dict) -> None:  # noqa: ARG002
         """Update the Jinja environment with any custom settings/filters/options for this handler.
@@ -128,13 +724,71 @@ class ZigHandler(BaseHandler):
         Parameters:
             config: MkDocs configuration, read from `mkdocs.yml`.
         """
-        self.env.trim_blocks = True
-        self.env.lstrip_blocks = True
-        self.env.keep_trailing_newline = False
-        self.env.filters["markdown"] = markdown.markdown
+        # Called for every page, possibly from several threads, but the environment only needs to be set up once.
+        # Pages wait for the first one to finish, and the flag is only set once the environment is complete.
+        if self._env_updated:
+            return
+        with self._env_lock:
+            if self._env_updated:
+                return
+            self.env.trim_blocks = True
+            self.env.lstrip_blocks = True
+            self.env.keep_trailing_newline = False
+            # Kept for custom templates, the templates of the handler use `convert_markdown`.
+            self.env.filters["markdown"] = partial(self.do_convert_markdown, heading_level=0)
+
+            # Templates are compiled once per process, and loaded before the first render.
+            # Buckets are keyed by template path and source, so edited custom templates are compiled again.
+            self.env.bytecode_cache = _bytecode_cache
+            for name in self.env.list_templates(extensions=["jinja"]):
+                self.env.get_template(name)
+            # Members are rendered by including the template of their type directly.
+            self.env.globals["member_templates"] = {
+                node_type: self.env.get_template(name) for node_type, name in _MEMBER_TEMPLATES.items()
+            }
+            # Nested members are rendered one after the other rather than by templates including each other.
+            self.env.globals["rendered_members"] = _iter_rendered_members
+            self._env_updated = True
+
+    def get_inventory_urls(self) -> list[tuple[str, dict[str, Any]]]:
+        """Return the URLs (and configuration options) of the inventory files to download."""
+        urls: list[tuple[str, dict[str, Any]]] = []
+        for inventory in self.config.inventories:
+            if isinstance(inventory, str):
+                urls.append((inventory, {}))
+            else:
+                options = dict(inventory)
+                urls.append((options.pop("url"), options))
+        return urls
+
+    @classmethod
+    def load_inventory(
+        cls,
+        in_file: BinaryIO,
+        url: str,
+        base_url: str | None = None,
+        domains: list[str] | None = None,
+        **kwargs: Any,  # noqa: ARG003
+    ) -> Iterator[tuple[str, str]]:
+        """Yield items and their URLs from an inventory file streamed from `in_file`.
+
+        Arguments:
+            in_file: The binary file-like object to read the inventory from.
+            url: The URL that this file is being streamed from (used to guess `base_url`).
+            base_url: The URL that this inventory's sub-paths are relative to.
+            domains: A list of domain strings to filter the inventory by, when not passed, "zig" will be used.
+            **kwargs: Ignore additional arguments passed from the config.
+
+        Yields:
+            Tuples of (item identifier, item URL).
+        """
+        domains = domains or ["zig"]
+        if base_url is None:
+            base_url = posixpath.dirname(url)
+
+        for item in Inventory.parse_sphinx(in_file, domain_filter=domains).values():
+            yield item.name, posixpath.join(base_url, item.uri)
 
-    # You can also implement the `get_inventory_urls` and `load_inventory` methods
-    # if you want to support loading object inventories.
     # You can also implement the `render_backlinks` method if you want to support backlinks.
 
 
@@ -156,5 +810,6 @@ def get_handler(
     return ZigHandler(
         config=ZigConfig.from_data(**handler_config),
         base_dir=base_dir,
+        docs_dir=Path(tool_config.docs_dir),
         **kwargs,
     )
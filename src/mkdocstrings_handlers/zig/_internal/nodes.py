@@ -0,0 +1,260 @@
+# Classes of the documented Zig declarations, passed to the templates.
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@dataclass(slots=True, kw_only=True)
+class Field:
+    """A documented field of a structure."""
+
+    node_type: ClassVar[str] = "field"
+    """The type of the node."""
+
+    name: str
+    """The name of the field."""
+    type: str
+    """The type of the field, as written in the source."""
+    doc: str = ""
+    """The doc comments of the field."""
+
+
+@dataclass(slots=True, kw_only=True)
+class Fields:
+    """The documented fields of a structure, rendered together where the first one is declared."""
+
+    node_type: ClassVar[str] = "fields"
+    """The type of the node."""
+
+    children: list[Field] = field(default_factory=list)
+    """The fields."""
+
+
+@dataclass(slots=True, kw_only=True)
+class Const:
+    """A documented constant or variable."""
+
+    node_type: ClassVar[str] = "const"
+    """The type of the node."""
+
+    name: str
+    """The name of the constant."""
+    short_signature: str
+    """The declaration of the constant, up to its name and type."""
+    doc: str = ""
+    """The doc comments of the constant."""
+
+
+@dataclass(slots=True, kw_only=True)
+class Struct:
+    """A structure, declared as a constant or returned by a function."""
+
+    node_type: ClassVar[str] = "struct"
+    """The type of the node."""
+
+    name: str
+    """The name of the structure."""
+    short_signature: str
+    """The declaration of the structure, up to its name."""
+    doc: str = ""
+    """The doc comments of the structure."""
+    children: list[Member] = field(default_factory=list)
+    """The documented members of the structure."""
+
+
+@dataclass(slots=True, kw_only=True)
+class Function:
+    """A documented function."""
+
+    node_type: ClassVar[str] = "function"
+    """The type of the node."""
+
+    name: str
+    """The name of the function."""
+    signature: str
+    """The signature of the function, everything before its body."""
+    short_signature: str
+    """The signature of the function, up to its name."""
+    doc: str = ""
+    """The doc comments of the function."""
+    return_struct: Struct | None = None
+    """The structure returned by the function, for functions returning types."""
+
+
+@dataclass(slots=True, kw_only=True)
+class Module:
+    """A Zig file, or a single declaration of a Zig file."""
+
+    node_type: ClassVar[str] = "module"
+    """The type of the node."""
+
+    path: str = ""
+    """The path of the file."""
+    name: str = ""
+    """The name of the module, or the dotted name of the selected declaration."""
+    doc: str = ""
+    """The top-level doc comments of the file."""
+    children: list[Member] = field(default_factory=list)
+    """The documented top-level declarations."""
+    member: Member | None = None
+    """The only declaration to document, when the identifier selects one."""
+    fingerprint: str = ""
+    """A hash of the documented surface of the file and of the files it re-exports declarations from.
+
+    It is empty for single declarations.
+    """
+
+
+Member = Fields | Const | Struct | Function
+"""The type of the members of structures and modules."""
+
+
+class _Reexport(NamedTuple):
+    """A public declaration bound to an imported Zig file, or to one of its declarations."""
+
+    name: str
+    """The public name of the declaration."""
+    short_signature: str
+    """The declaration, up to its name and type."""
+    doc: str
+    """The doc comments of the declaration."""
+    path: str
+    """The path of the imported file, relative to the importing file."""
+    target: str
+    """The dotted name of the declaration in the imported file, or an empty string for the whole file."""
+
+
+class _ParsedFile(NamedTuple):
+    """The docs extracted from a Zig file, with its imports, to discover and follow files without parsing it again."""
+
+    docs: Module
+    """The docs of the file."""
+    imports: list[str]
+    """The paths of the imported Zig files, relative to the file."""
+    reexports: list[_Reexport]
+    """The public declarations bound to imported Zig files."""
+
+
+_NODE_CLASSES: dict[str, type] = {cls.node_type: cls for cls in (Field, Fields, Const, Struct, Function, Module)}
+
+
+def _node_to_rows(node: Any) -> list[dict[str, Any]]:
+    """Convert a node to a flat list of plain data, one dictionary per node, parents first.
+
+    Nested nodes are replaced by their index in the list, so that the data can be stored as JSON
+    or sent to worker processes however deeply the nodes are nested.
+    """
+    rows: list[dict[str, Any]] = [{}]
+    stack = [(node, 0)]
+    while stack:
+        current, index = stack.pop()
+        row = rows[index]
+        row["node_type"] = current.node_type
+        for node_field in fields(current):
+            value = getattr(current, node_field.name)
+            if isinstance(value, list):
+                indices = []
+                for child in value:
+                    indices.append(len(rows))
+                    stack.append((child, len(rows)))
+                    rows.append({})
+                value = indices
+            elif value is not None and hasattr(value, "node_type"):
+                stack.append((value, len(rows)))
+                rows.append({})
+                value = len(rows) - 1
+            row[node_field.name] = value
+    return rows
+
+
+def _node_from_rows(rows: list[dict[str, Any]]) -> Any:
+    """Create a node from the rows returned by `_node_to_rows`."""
+    # Children come after their parent, so nodes are created from the last row up.
+    nodes: list[Any] = [None] * len(rows)
+    for index in range(len(rows) - 1, -1, -1):
+        kwargs = {}
+        for name, value in rows[index].items():
+            if name == "node_type":
+                continue
+            if isinstance(value, list):
+                kwargs[name] = [nodes[child] for child in value]
+            elif isinstance(value, int):
+                kwargs[name] = nodes[value]
+            else:
+                kwargs[name] = value
+        nodes[index] = _NODE_CLASSES[rows[index]["node_type"]](**kwargs)
+    return nodes[0]
+
+
+def _parsed_to_data(parsed: _ParsedFile) -> dict[str, Any]:
+    """Convert a parsed file to plain data, to store it as JSON or send it from worker processes."""
+    return {
+        "docs": _node_to_rows(parsed.docs),
+        "imports": parsed.imports,
+        "reexports": [list(reexport) for reexport in parsed.reexports],
+    }
+
+
+def _parsed_from_data(data: dict[str, Any]) -> _ParsedFile:
+    """Create a parsed file from the plain data returned by `_parsed_to_data`."""
+    return _ParsedFile(
+        docs=_node_from_rows(data["docs"]),
+        imports=data["imports"],
+        reexports=[_Reexport(*reexport) for reexport in data["reexports"]],
+    )
+
+
+def _iter_dotted_names(children: list[Member], prefix: str = "") -> Iterator[str]:
+    """Yield the dotted names of the declarations rendered for the given members, as used in their anchors."""
+    # Nested members are visited with a stack of iterators, each with the prefix of its members.
+    stack: list[tuple[Iterator[Member], str]] = [(iter(children), prefix)]
+    while stack:
+        members, members_prefix = stack[-1]
+        child = next(members, None)
+        if child is None:
+            stack.pop()
+            continue
+        if isinstance(child, Fields):
+            for member_field in child.children:
+                yield members_prefix + member_field.name
+            continue
+        name = members_prefix + child.name
+        yield name
+        if isinstance(child, Struct):
+            stack.append((iter(child.children), f"{name}."))
+        elif isinstance(child, Function) and child.return_struct is not None:
+            stack.append((iter([child.return_struct]), f"{name}."))
+
+
+def _iter_rendered_members(
+    children: list[Member],
+    heading_level: int,
+    html_id: str,
+) -> Iterator[tuple[Member, int, str, bool]]:
+    """Yield the members to render, in document order, with their heading level and the prefix of their anchors.
+
+    Structures and functions are yielded a second time, flagged as closing, after their nested members.
+    Templates render each item on its own, so that rendering deeply nested members doesn't recurse.
+    """
+    stack: list[tuple[Member, int, str, bool]] = [
+        (child, heading_level, html_id, False) for child in reversed(children)
+    ]
+    while stack:
+        item = stack.pop()
+        yield item
+        member, level, prefix, closing = item
+        if closing:
+            continue
+        if isinstance(member, Struct):
+            stack.append((member, level, prefix, True))
+            nested_prefix = f"{prefix}{member.name}."
+            stack.extend((child, level + 1, nested_prefix, False) for child in reversed(member.children))
+        elif isinstance(member, Function):
+            stack.append((member, level, prefix, True))
+            if member.return_struct is not None:
+                stack.append((member.return_struct, level + 1, f"{prefix}{member.name}.", False))
@@ -1,172 +1,533 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import hashlib
+from bisect import bisect_right
+from dataclasses import replace
+from functools import cache, cached_property
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import tree_sitter_zig
-from tree_sitter import Language, Parser
+from tree_sitter import Language, Parser, Query, QueryCursor
+
+from mkdocstrings_handlers.zig._internal.nodes import (
+    Const,
+    Field,
+    Fields,
+    Function,
+    Module,
+    Struct,
+    _node_to_rows,
+    _parsed_to_data,
+    _ParsedFile,
+    _Reexport,
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable, Iterator
+    from hashlib import _Hash
+
     from tree_sitter import Node, Tree
 
+    from mkdocstrings_handlers.zig._internal.nodes import Member
+
+    _T = TypeVar("_T")
+    # Parsings yield the structure nodes they need the docs of, and are sent back their docs and members.
+    _Parsing = Generator[Node, tuple[str, list[Member]], _T]
+
+
+_MEMBER_TYPES = ("container_field", "function_declaration", "variable_declaration")
+_NAME_TYPES = ("identifier", "builtin_identifier")
+
+_IMPORTS_QUERY = """
+(builtin_function (builtin_identifier) @name (arguments . (string (string_content) @path)) (#eq? @name "@import"))
+"""
+
+# Modules of `build.zig` files are created with `.root_source_file = b.path("src/root.zig")`.
+_ROOT_SOURCE_FILES_QUERY = """
+(assignment_expression
+  left: (field_expression member: (identifier) @field)
+  right: (call_expression (string (string_content) @path))
+  (#eq? @field "root_source_file"))
+"""
+_MISSING = object()
+
 
 class _ZigDocsExtractor:
     ZIG_LANGUAGE = Language(tree_sitter_zig.language())
-    parser = Parser(ZIG_LANGUAGE)
 
     code: bytes
+    parser: Parser
     tree: Tree
 
-    def __init__(self, code: str):
+    def __init__(self, code: str, previous: _ZigDocsExtractor | None = None):
+        """Parse the code.
+
+        When the extractor of a previous version of the same file is given,
+        its tree is edited and reparsed incrementally, and the docs of the top-level
+        declarations that were not touched by the edit are reused.
+        Note that the tree of the previous extractor is modified in the process.
+        """
         self.code = code.encode("utf-8")
-        self.tree = self.parser.parse(self.code)
+        # Slices of a memoryview don't copy the source, only the final strings are decoded.
+        self._view = memoryview(self.code)
+        # Parsers are cheap to create but not safe to share between threads.
+        self.parser = Parser(self.ZIG_LANGUAGE)
+        # Docs of top-level members, keyed by their byte range including preceding comments.
+        self._members: dict[tuple[int, int], Member | Field | None] = {}
+        self._reusable: dict[tuple[int, int], Member | Field | None] = {}
+        self._docs: Module | None = None
+        self._fingerprint: str | None = None
+
+        if previous is None:
+            self.tree = self.parser.parse(self.code)
+        elif previous.code == self.code:
+            self.tree = previous.tree
+            self._reusable = previous._members
+            self._docs = previous._docs
+            self._fingerprint = previous._fingerprint
+        else:
+            self.tree = self._reparse(previous)
+
+    def _reparse(self, previous: _ZigDocsExtractor) -> Tree:
+        old_code = previous.code
+        new_code = self.code
+        start, old_end, new_end = _find_edit(old_code, new_code)
+        # The documented surface around the edit is hashed before the tree of the previous version is edited.
+        old_surface = previous._get_surface_around(start, old_end) if previous._docs is not None else None
+        old_tree = previous.tree
+        old_tree.edit(
+            start_byte=start,
+            old_end_byte=old_end,
+            new_end_byte=new_end,
+            start_point=_byte_to_point(old_code, start),
+            old_end_point=_byte_to_point(old_code, old_end),
+            new_end_point=_byte_to_point(new_code, new_end),
+        )
+        tree = self.tree = self.parser.parse(new_code, old_tree)
+
+        # Everything between the edit and the ranges where the syntax changed must be extracted again,
+        # the members lying strictly outside of them (in new coordinates) are unchanged.
+        dirty = [(start, new_end)]
+        dirty.extend((changed.start_byte, changed.end_byte) for changed in old_tree.changed_ranges(tree))
+        shift = new_end - old_end
+        for (member_start, member_end), member in previous._members.items():
+            if member_end < start:
+                key = (member_start, member_end)
+            elif member_start > old_end:
+                key = (member_start + shift, member_end + shift)
+            else:
+                continue
+            if all(key[1] < dirty_start or key[0] > dirty_end for dirty_start, dirty_end in dirty):
+                self._reusable[key] = member
+
+        if old_surface is not None:
+            region_start, region_end, surface = self._get_surface_around(start, new_end)
+            # When the syntax only changed within the same top-level declarations, and their documented surface
+            # is the same, only function bodies or regular comments were edited: the docs did not change.
+            if (
+                surface == old_surface[2]
+                and (region_start, region_end) == (old_surface[0], old_surface[1] + shift)
+                and all(region_start <= dirty_start and dirty_end <= region_end for dirty_start, dirty_end in dirty)
+            ):
+                self._docs = previous._docs
+                self._fingerprint = previous._fingerprint
+                self._members = dict(self._reusable)
+        return tree
+
+    def get_docs(self) -> Module:
+        if self._docs is None:
+            doc, children = self._run(self._parse_structure(self.tree.root_node, top_level=True))
+            self._docs = Module(doc=doc, children=children)
+        return self._docs
+
+    def get_fingerprint(self) -> str:
+        """Return a hash of the documented surface of the file.
+
+        It covers doc comments, signatures, fields and the nesting of declarations, but neither
+        function bodies (except the structures they return) nor regular comments,
+        so that edits which can't change the docs keep the same fingerprint.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            self._update_surfaces(digest, self._get_members(self.tree.root_node))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _get_surface_around(self, start: int, end: int) -> tuple[int, int, bytes]:
+        """Hash the documented surface of the top-level nodes overlapping a byte range.
+
+        Returns the hash with the smallest range containing both the byte range and these nodes.
+        """
+        digest = hashlib.sha256()
+        root = self.tree.root_node
+        region_start, region_end = start, end
+        # `first_child_for_byte` is only called with a byte covered by a child, it crashes otherwise.
+        last = root.child(root.child_count - 1) if root.child_count else None
+        child: Node | None = root.first_child_for_byte(start) if last is not None and start < last.end_byte else None
+        nodes = []
+        while child is not None and child.start_byte <= end:
+            region_start = min(region_start, child.start_byte)
+            region_end = max(region_end, child.end_byte)
+            nodes.append(child)
+            child = child.next_sibling
+        self._update_surfaces(digest, nodes)
+        return region_start, region_end, digest.digest()
+
+    def _update_surfaces(self, digest: _Hash, nodes: Iterable[Node]) -> None:
+        """Hash the documented surface of nodes, then of the structures nested in each of them."""
+        # Nested structures are hashed with an explicit stack of iterators, so that deep nesting
+        # can't exceed the recursion limit. Each iterator is followed by the bytes closing it.
+        stack: list[tuple[Iterator[Node], bytes]] = [(iter(nodes), b"")]
+        while stack:
+            iterator, closing = stack[-1]
+            node = next(iterator, None)
+            if node is None:
+                stack.pop()
+                digest.update(closing)
+            elif node.type == "struct_declaration":
+                digest.update(b"{")
+                stack.append((iter(self._get_members(node)), b"}"))
+            else:
+                stack.append((iter(self._update_surface(digest, node)), b""))
+
+    def _update_surface(self, digest: _Hash, node: Node) -> Iterable[Node]:
+        """Hash the parts of a node that docs are extracted from, conservatively.
+
+        Returns the structures declared by the node, whose surface is part of the node's one.
+        """
+        if node.type == "comment":
+            if self.code.startswith((b"///", b"//!"), node.start_byte):
+                self._update_range(digest, node.start_byte, node.end_byte)
+            return ()
+
+        if not node.is_named:
+            return ()
+
+        # Other nodes only separate doc comments from the next member.
+        digest.update(node.type.encode("utf-8") + b"\0")
+        if node.type == "function_declaration":
+            body = node.child_by_field_name("body")
+            self._update_range(digest, node.start_byte, node.end_byte if body is None else body.start_byte)
+            return self._get_returned_structs(node)
+        if node.type == "variable_declaration" and (struct_node := self._get_struct_declaration(node)) is not None:
+            self._update_range(digest, node.start_byte, struct_node.start_byte)
+            return (struct_node,)
+        if node.type in _MEMBER_TYPES:
+            self._update_range(digest, node.start_byte, node.end_byte)
+        return ()
+
+    def _update_range(self, digest: _Hash, start: int, end: int) -> None:
+        # Ranges are prefixed with their length, so that consecutive ranges can't be confused.
+        digest.update(b"%d:" % (end - start))
+        digest.update(self._view[start:end])
+
+    def get_member_docs(self, qualified_name: str) -> Member | None:
+        """Extract docs of a single declaration, given its dotted name relative to the module, like `Point.x`.
+
+        Only the structures on the way to the declaration are visited, other declarations are skipped.
+        Fields are returned in a group of their own, like in the docs of a whole structure.
+        """
+        node = self.tree.root_node
+        *parents, name = qualified_name.split(".")
+        for parent in parents:
+            found = self._find_member(node, parent)
+            struct_node = self._get_struct_declaration(found[0]) if found else None
+            if struct_node is None:
+                return None
+            node = struct_node
+
+        found = self._find_member(node, name)
+        if found is None:
+            return None
+        member_node, doc = found
+        member = self._run(self._parse_member(member_node, doc))
+        if isinstance(member, Field):
+            return Fields(children=[member])
+        return member
+
+    def get_parsed_file(self) -> _ParsedFile:
+        """Return the docs of the file, with its fingerprint, the files it imports and the declarations it re-exports."""
+        docs = replace(self.get_docs(), fingerprint=self.get_fingerprint())
+        return _ParsedFile(docs=docs, imports=self.get_imports(), reexports=self.get_reexports())
+
+    def get_imports(self) -> list[str]:
+        """Return the paths of the Zig files imported with `@import`, relative to the file, in order of appearance.
+
+        Imports of modules by name, like `@import("std")`, are not returned.
+        """
+        paths = self._get_captured_strings(_IMPORTS_QUERY)
+        return [path for path in paths if path.endswith(".zig")]
+
+    def get_root_source_files(self) -> list[str]:
+        """Return the root source files of the modules created in a `build.zig` file, relative to it."""
+        return self._get_captured_strings(_ROOT_SOURCE_FILES_QUERY)
+
+    def get_reexports(self) -> list[_Reexport]:
+        """Return the public top-level declarations bound to imported Zig files or to their declarations.
+
+        Like `pub const util = @import("util.zig");` or `pub const Point = @import("geometry.zig").Point;`.
+        """
+        reexports = []
+        doc_lines: list[str] = []
+        for child in _iter_children(self.tree.root_node):
+            if child.type == "comment":
+                if self.code.startswith(b"///", child.start_byte):
+                    doc_lines.append(self._decode(child.start_byte + 3, child.end_byte).strip())
+                continue
+            doc = "\n".join(doc_lines)
+            doc_lines = []
+            if child.type != "variable_declaration" or not self.code.startswith(b"pub", child.start_byte):
+                continue
+
+            value = child.named_child(child.named_child_count - 1)
+            target: list[str] = []
+            while value is not None and value.type == "field_expression":
+                target.insert(0, self._get_node_text(value.child_by_field_name("member")))  # type: ignore[arg-type]
+                value = value.child_by_field_name("object")
+            path = self._get_import_path(value) if value is not None else None
+            name = self._get_node_name(child)
+            if path and name:
+                reexports.append(
+                    _Reexport(name, self._get_short_const_signature(child), doc, path, ".".join(target)),
+                )
+        return reexports
+
+    def _get_import_path(self, node: Node) -> str | None:
+        """Return the path of the file imported by an `@import("file.zig")` expression."""
+        if node.type != "builtin_function" or self._view[node.start_byte : node.start_byte + 7] != b"@import":
+            return None
+        arguments = node.named_child(node.named_child_count - 1)
+        string = arguments.named_child(0) if arguments is not None else None
+        content = string.named_child(0) if string is not None and string.type == "string" else None
+        if content is None:
+            return None
+        path = self._get_node_text(content)
+        return path if path.endswith(".zig") else None
+
+    def _get_captured_strings(self, query: str) -> list[str]:
+        captures = QueryCursor(_compile_query(query)).captures(self.tree.root_node)
+        return [self._get_node_text(node) for node in sorted(captures.get("path", ()), key=attrgetter("start_byte"))]
+
+    def _find_member(self, node: Node, name: str) -> tuple[Node, str] | None:
+        """Find a member of a structure by name, returning it with its doc comments."""
+        # Only the ranges of doc comments are tracked, they are decoded for the matching member only.
+        doc_ranges: list[tuple[int, int]] = []
+        for child in self._get_members(node):
+            if child.type == "comment":
+                if self.code.startswith(b"///", child.start_byte):
+                    doc_ranges.append((child.start_byte + 3, child.end_byte))
+                continue
+
+            if not child.is_named:
+                continue
+
+            if child.type in _MEMBER_TYPES and self._get_node_name(child) == name:
+                return child, "\n".join(self._decode(start, end).strip() for start, end in doc_ranges)
+            doc_ranges = []
 
-    def get_docs(self) -> dict:
-        return self._parse_structure(self.tree.root_node)
+        return None
+
+    def _run(self, parsing: _Parsing[_T]) -> _T:
+        """Run a parsing to completion, parsing the structures it needs with an explicit stack.
 
-    def _parse_structure(self, node: Node) -> dict:
-        """Parse structure docs. A module is a structure too."""
+        Each nested structure is parsed by a parsing of its own, pushed on the stack until it's done,
+        so that deeply nested structures can't exceed the recursion limit.
+        """
+        stack: list[_Parsing[Any]] = [parsing]
+        result: tuple[str, list[Member]] | None = None
+        while True:
+            try:
+                node = stack[-1].send(result)  # type: ignore[arg-type]
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                result = stop.value
+            else:
+                stack.append(self._parse_structure(node))
+                result = None
+
+    def _parse_structure(self, node: Node, *, top_level: bool = False) -> _Parsing[tuple[str, list[Member]]]:
+        """Parse structure docs and members. A module is a structure too."""
         module_doc = []
-        fields = []
-        children = []
+        fields: Fields | None = None
+        children: list[Member] = []
+        # Doc comments are accumulated in a single forward pass and attached to the next member.
+        doc_lines: list[str] = []
+        comments_start = -1
 
-        for child in node.children:
+        for child in self._get_members(node):
             if child.type == "comment":
-                text = self._get_node_text(child)
-                if text.startswith("//!"):
-                    module_doc.append(text[3:].strip())
-            elif child.type == "container_field":
-                field = self._parse_field(child)
-                if not field:
-                    continue
-
-                if not fields:
-                    children.append(
-                        {
-                            "node_type": "fields",
-                            "children": fields,
-                        },
-                    )
-
-                fields.append(field)
-            elif child.type == "function_declaration":
-                function = self._parse_function(child)
-                if function:
-                    children.append(function)
-            elif child.type == "variable_declaration":
-                if self._is_import(child):
-                    continue
-
-                name = self._get_node_name(child)
-                if not name:
-                    continue
-
-                doc = self._get_doc_comments(child)
-                struct_node = self._get_struct_declaration(child)
-                if struct_node:
-                    children.append(
-                        {
-                            "node_type": "struct",
-                            "short_signature": self._get_short_struct_signature(child),
-                            "name": name,
-                            "doc": doc,
-                            **self._parse_structure(struct_node),
-                        },
-                    )
-                elif doc:
-                    children.append(
-                        {
-                            "node_type": "const",
-                            "short_signature": self._get_short_const_signature(child),
-                            "name": name,
-                            "doc": doc,
-                        },
-                    )
-
-        result = {}
-        if module_doc:
-            result["doc"] = "\n".join(module_doc)
-
-        if children:
-            result["children"] = children
-
-        return result
-
-    def _parse_function(self, node: Node) -> dict | None:
+                if comments_start < 0:
+                    comments_start = child.start_byte
+                if self.code.startswith(b"///", child.start_byte):
+                    doc_lines.append(self._decode(child.start_byte + 3, child.end_byte).strip())
+                elif self.code.startswith(b"//!", child.start_byte):
+                    module_doc.append(self._decode(child.start_byte + 3, child.end_byte).strip())
+                continue
+
+            if not child.is_named:
+                continue
+
+            doc = "\n".join(doc_lines)
+            start = child.start_byte if comments_start < 0 else comments_start
+            doc_lines = []
+            comments_start = -1
+
+            if child.type not in _MEMBER_TYPES:
+                continue
+
+            if top_level:
+                member = yield from self._parse_top_level_member(child, doc, start)
+            else:
+                member = yield from self._parse_member(child, doc)
+            if not member:
+                continue
+
+            if isinstance(member, Field):
+                if fields is None:
+                    fields = Fields()
+                    children.append(fields)
+
+                fields.children.append(member)
+            else:
+                children.append(member)
+
+        return "\n".join(module_doc), children
+
+    def _get_members(self, node: Node) -> Iterable[Node]:
+        """Get the children of a structure node. Anonymous nodes are ignored by the caller."""
+        return _iter_children(node)
+
+    def _parse_top_level_member(self, node: Node, doc: str, start: int) -> _Parsing[Member | Field | None]:
+        """Parse a top-level member, reusing the result of the previous parse if it did not change.
+
+        The `start` offset is the start of the comments preceding the member, which its docs depend on.
+        """
+        key = (start, node.end_byte)
+        # Docs are extracted again from the same extractor when its file is collected by a later build.
+        member = self._members.get(key, _MISSING)
+        if member is _MISSING:
+            member = self._reusable.get(key, _MISSING)
+        if member is _MISSING:
+            member = yield from self._parse_member(node, doc)
+        self._members[key] = member  # type: ignore[assignment]
+        return member  # type: ignore[return-value]
+
+    def _parse_member(self, node: Node, doc: str) -> _Parsing[Member | Field | None]:
+        """Parse a field or a declaration of a structure, given its doc comments."""
+        if node.type == "container_field":
+            return self._parse_field(node, doc)
+
+        if node.type == "function_declaration":
+            return (yield from self._parse_function(node, doc))
+
+        if self._is_import(node):
+            return None
+
+        name = self._get_node_name(node)
+        if not name:
+            return None
+
+        struct_node = self._get_struct_declaration(node)
+        if struct_node:
+            struct_doc, children = yield struct_node
+            return Struct(
+                short_signature=self._get_short_struct_signature(node),
+                name=name,
+                # Container-level doc comments take precedence.
+                doc=struct_doc or doc,
+                children=children,
+            )
+
+        if doc:
+            return Const(
+                short_signature=self._get_short_const_signature(node),
+                name=name,
+                doc=doc,
+            )
+
+        return None
+
+    def _parse_function(self, node: Node, doc_comment: str) -> _Parsing[Function | None]:
         """Parse function information."""
         fn_name = self._get_node_name(node)
-        doc_comment = self._get_doc_comments(node)
         if fn_name and doc_comment:
-            result = {
-                "node_type": "function",
-                "name": fn_name,
-                "doc": doc_comment,
-                "signature": self._get_function_signature(node),
-                "short_signature": self._get_short_function_signature(node),
-            }
-
-            return_struct = self._get_return_struct(node)
-            if return_struct:
-                result["return_struct"] = return_struct
-
-            return result
+            return Function(
+                name=fn_name,
+                doc=doc_comment,
+                signature=self._get_function_signature(node),
+                short_signature=self._get_short_function_signature(node),
+                return_struct=(yield from self._get_return_struct(node)),
+            )
 
         return None
 
     def _get_function_signature(self, node: Node) -> str:
-        """Extract signature of the function."""
-        return self._get_node_text(node).split("{")[0].strip()
+        """Extract signature of the function: everything before its body."""
+        body = node.child_by_field_name("body")
+        if body is not None:
+            end = body.start_byte
+        else:
+            # Extern functions have no body but end with a semicolon.
+            return_type = node.child_by_field_name("type")
+            end = return_type.end_byte if return_type is not None else node.end_byte
+        return self._decode(node.start_byte, end).strip()
 
     def _get_short_function_signature(self, node: Node) -> str:
-        """Extract short function signature."""
-        return self._get_node_text(node).split("(")[0].strip()
+        """Extract short function signature: everything up to the function name."""
+        name = node.child_by_field_name("name")
+        if name is None:
+            return self._get_text_before(node, b"(").strip()
+        return self._decode(node.start_byte, name.end_byte).strip()
 
     def _get_node_name(self, node: Node) -> str | None:
         """Get node identifier as it's name."""
-        for child in node.children:
-            if child.type in ("identifier", "builtin_identifier"):
-                return self._get_node_text(child)
-
-        return None
+        # Variable declarations have no name field, their name is their first identifier.
+        name = node.child_by_field_name("name") if node.type != "variable_declaration" else None
+        if name is None:
+            name = _find_child(node, _NAME_TYPES)
+        return self._get_node_text(name) if name is not None else None
 
     def _is_import(self, node: Node) -> bool:
         """Check if the given constant is an import."""
-        for child in node.children:
-            if (
-                child.type == "builtin_function"
-                and self._get_node_name(child) == "@import"
-            ):
-                return True
+        cursor = node.walk()
+        has_child = cursor.goto_first_child()
+        while has_child:
+            child = cursor.node
+            if child is not None and child.type == "builtin_function":
+                name = _find_child(child, _NAME_TYPES)
+                if name is not None and self._view[name.start_byte : name.end_byte] == b"@import":
+                    return True
+            has_child = cursor.goto_next_sibling()
 
         return False
 
+    def _decode(self, start: int, end: int) -> str:
+        """Decode a range of the source."""
+        return str(self._view[start:end], "utf-8")
+
     def _get_node_text(self, node: Node) -> str:
         """Extract source text for a node."""
-        return self.code[node.start_byte : node.end_byte].decode("utf-8")
-
-    def _get_doc_comments(self, node: Node) -> str:
-        """Extract preceding doc comments."""
-        doc_comments = []
+        return self._decode(node.start_byte, node.end_byte)
 
-        prev = node.prev_named_sibling
-        while prev and prev.type == "comment":
-            text = self._get_node_text(prev)
-            if text.startswith("///"):
-                doc_comments.insert(0, text[3:].strip())
-            prev = prev.prev_named_sibling
-
-        return "\n".join(doc_comments)
+    def _get_text_before(self, node: Node, separator: bytes) -> str:
+        """Extract source text of a node up to the first occurrence of `separator`."""
+        end = self.code.find(separator, node.start_byte, node.end_byte)
+        return self._decode(node.start_byte, node.end_byte if end == -1 else end)
 
     def _get_struct_declaration(self, node: Node) -> Node | None:
         """Extract struct declaration node."""
-        for child in node.children:
-            if child.type == "struct_declaration":
-                return child
-
-        return None
+        return _find_child(node, ("struct_declaration",))
 
     def _get_short_const_signature(self, node: Node) -> str:
         """Use everything before = in the const declaration as a short signature"""
-        return self._get_node_text(node).split("=")[0].strip()
+        assign = _find_child(node, ("=",))
+        if assign is not None:
+            return self._decode(node.start_byte, assign.start_byte).strip()
+
+        return self._get_text_before(node, b";").strip()
 
     def _get_short_struct_signature(self, node: Node) -> str:
         """
@@ -175,40 +536,40 @@ class _ZigDocsExtractor:
         """
         return "struct".join(self._get_short_const_signature(node).split("const"))
 
-    def _parse_field(self, node: Node) -> dict | None:
+    def _parse_field(self, node: Node, doc: str) -> Field | None:
         """Parse structure field node."""
-        field_name = None
-        field_type = None
-        for child in node.children:
-            if child.type == "identifier" and not field_name:
-                field_name = self._get_node_text(child)
-            elif child.type == ":":
-                continue
-            else:
-                field_type = self._get_node_text(child)
-                break
-
-        doc = self._get_doc_comments(node)
+        if not doc:
+            return None
 
-        if field_name and field_type and doc:
-            return {
-                "name": field_name,
-                "type": field_type,
-                "doc": doc,
-            }
+        # Only fields starting with their name are documented, not `comptime` fields or fields of tuples.
+        field_name = node.child_by_field_name("name")
+        field_type = node.child_by_field_name("type")
+        if field_name is None or field_type is None or field_name.start_byte != node.start_byte:
+            return None
 
-        return None
+        return Field(name=self._get_node_text(field_name), type=self._get_node_text(field_type), doc=doc)
 
-    def _get_return_struct(self, node: Node) -> dict | None:
+    def _get_return_struct(self, node: Node) -> _Parsing[Struct | None]:
         """
         Parse structure returned from a function.
         Probably recursive search for return is needed, but for we support only basic case.
         """
+        for struct in self._get_returned_structs(node):
+            doc, children = yield struct
+            if not doc and not children:
+                continue
+
+            return Struct(name="return_struct", short_signature="return struct", doc=doc, children=children)
+
+        return None
+
+    def _get_returned_structs(self, node: Node) -> Iterator[Node]:
+        """Yield the structures returned by top-level return statements of a function"""
         function_body = self._get_function_body(node)
         if not function_body:
-            return None
+            return
 
-        for child in function_body.children:
+        for child in _iter_children(function_body):
             if child.type != "expression_statement":
                 continue
 
@@ -217,36 +578,189 @@ class _ZigDocsExtractor:
                 continue
 
             struct = self._get_struct_declaration(return_expression)
-            if not struct:
-                continue
-
-            parsed_struct = self._parse_structure(struct)
-            if not parsed_struct:
-                continue
-
-            parsed_struct["node_type"] = "struct"
-            parsed_struct["name"] = "return_struct"
-            parsed_struct["short_signature"] = "return struct"
-            return parsed_struct
-
-        return None
+            if struct:
+                yield struct
 
     def _get_function_body(self, node: Node) -> Node | None:
         """Get the block which represents the function's body"""
-        for child in node.children:
-            if child.type == "block":
-                return child
-
-        return None
+        return node.child_by_field_name("body")
 
     def _get_return_expression(self, node: Node) -> Node | None:
         """Check if the statement is return and return the return value"""
-        for child in node.children:
-            if child.type == "return_expression":
-                return child
+        # Statements are an expression followed by a semicolon.
+        expression = node.child(0)
+        return expression if expression is not None and expression.type == "return_expression" else None
+
+
+class _ZigQueryDocsExtractor(_ZigDocsExtractor):
+    """Extractor matching the members of structures with a precompiled query instead of walking their children.
+
+    It returns the same docs as `_ZigDocsExtractor`. The query finds the nodes that the helper methods
+    would otherwise look for in Python, and the helpers fall back to the walk when a node was not matched.
+    """
+
+    # Patterns start at the members of the queried structure (see `set_max_start_depth`),
+    # the other captures are attributed to the member containing them.
+    # The query is compiled on first use, as compiling it takes longer than importing the handler.
+    MEMBERS_QUERY_SOURCE = """
+        (_) @member
+        (container_field name: (identifier) @name type: (_) @type)
+        (function_declaration name: (identifier) @name)
+        (function_declaration
+          body: (block (expression_statement (return_expression (struct_declaration) @return_structs))))
+        (variable_declaration . (identifier) @name)
+        (variable_declaration "=" @assign)
+        (variable_declaration (struct_declaration) @struct)
+        (variable_declaration (builtin_function . (builtin_identifier) @builtins))
+        """
+
+    def __init__(self, code: str, previous: _ZigDocsExtractor | None = None):
+        # Structures are already queried by the parent constructor, to compare the surface of edited files.
+        self._captures: dict[int, dict[str, Any]] = {}
+        super().__init__(code, previous)
+
+    @cached_property
+    def _use_query(self) -> bool:
+        # Error recovery can give unusual shapes to the tree, which only the walk handles exactly.
+        return not self.tree.root_node.has_error
+
+    def _get_members(self, node: Node) -> Iterable[Node]:
+        if not self._use_query:
+            return super()._get_members(node)
+
+        cursor = QueryCursor(_compile_query(self.MEMBERS_QUERY_SOURCE))
+        cursor.set_max_start_depth(1)
+        captures = cursor.captures(node)
+        # Captures are grouped by name, but not sorted by position.
+        members = sorted((member for member in captures.pop("member") if member != node), key=attrgetter("start_byte"))
+
+        starts = [member.start_byte for member in members]
+        infos: list[dict[str, Any]] = [{} for _ in members]
+        for name, nodes in captures.items():
+            for captured in sorted(nodes, key=attrgetter("start_byte")):
+                info = infos[bisect_right(starts, captured.start_byte) - 1]
+                if name.endswith("s"):
+                    info.setdefault(name, []).append(captured)
+                else:
+                    info.setdefault(name, captured)
+
+        for member, info in zip(members, infos):
+            self._captures[member.id] = info
+        return members
+
+    def _get_node_name(self, node: Node) -> str | None:
+        info = self._captures.get(node.id)
+        if info is not None and "name" in info:
+            return self._get_node_text(info["name"])
+        return super()._get_node_name(node)
+
+    def _is_import(self, node: Node) -> bool:
+        info = self._captures.get(node.id)
+        if info is None:
+            return super()._is_import(node)
+        return any(self._view[name.start_byte : name.end_byte] == b"@import" for name in info.get("builtins", ()))
+
+    def _get_struct_declaration(self, node: Node) -> Node | None:
+        info = self._captures.get(node.id)
+        if info is None:
+            return super()._get_struct_declaration(node)
+        return info.get("struct")
+
+    def _get_short_const_signature(self, node: Node) -> str:
+        info = self._captures.get(node.id)
+        if info is None or "assign" not in info:
+            return super()._get_short_const_signature(node)
+        return self._decode(node.start_byte, info["assign"].start_byte).strip()
+
+    def _parse_field(self, node: Node, doc: str) -> Field | None:
+        info = self._captures.get(node.id)
+        # The walk only accepts fields starting with their name.
+        if info is None or "name" not in info or info["name"].start_byte != node.start_byte:
+            return super()._parse_field(node, doc)
+
+        if doc:
+            return Field(name=self._get_node_text(info["name"]), type=self._get_node_text(info["type"]), doc=doc)
 
         return None
 
+    def _get_returned_structs(self, node: Node) -> Iterator[Node]:
+        info = self._captures.get(node.id)
+        if info is None:
+            return super()._get_returned_structs(node)
+        return iter(info.get("return_structs", ()))
+
+
+def _iter_children(node: Node) -> Iterator[Node]:
+    """Yield the children of a node with a cursor, without building the list of all of them."""
+    cursor = node.walk()
+    has_child = cursor.goto_first_child()
+    while has_child:
+        yield cursor.node  # type: ignore[misc]
+        has_child = cursor.goto_next_sibling()
+
+
+def _find_child(node: Node, types: tuple[str, ...]) -> Node | None:
+    """Return the first child of a node of one of the given types, visiting the children up to it."""
+    cursor = node.walk()
+    has_child = cursor.goto_first_child()
+    while has_child:
+        child = cursor.node
+        if child is not None and child.type in types:
+            return child
+        has_child = cursor.goto_next_sibling()
+    return None
+
+
+@cache
+def _compile_query(source: str) -> Query:
+    return Query(_ZigDocsExtractor.ZIG_LANGUAGE, source)
+
+
+def _find_edit(old: bytes, new: bytes) -> tuple[int, int, int]:
+    """Find the single edit turning `old` into `new`, as `(start, old_end, new_end)` byte offsets."""
+    limit = min(len(old), len(new))
+    start = 0
+    # Compare increasingly small blocks, so that the bulk of the work is done by bytes comparisons.
+    step = 4096
+    while step:
+        while start + step <= limit and old[start : start + step] == new[start : start + step]:
+            start += step
+        step //= 8
+
+    limit -= start
+    suffix = 0
+    step = 4096
+    while step:
+        while (
+            suffix + step <= limit
+            and old[len(old) - suffix - step : len(old) - suffix] == new[len(new) - suffix - step : len(new) - suffix]
+        ):
+            suffix += step
+        step //= 8
+
+    return start, len(old) - suffix, len(new) - suffix
+
+
+def _byte_to_point(code: bytes, offset: int) -> tuple[int, int]:
+    """Convert a byte offset to a (row, column) point."""
+    row = code.count(b"\n", 0, offset)
+    return row, offset - (code.rfind(b"\n", 0, offset) + 1)
+
+
+_EXTRACTORS: dict[str, type[_ZigDocsExtractor]] = {
+    "walk": _ZigDocsExtractor,
+    "query": _ZigQueryDocsExtractor,
+}
+"""Extractor classes by engine name."""
+
+
+def _extract_docs(code: str, engine: str = "walk") -> dict[str, Any]:
+    """Extract docs, imports and re-exports from Zig source code, as plain data. Picklable entry point for worker processes.
+
+    Nodes are sent as flat rows, pickling them would exceed the recursion limit for deeply nested structures.
+    """
+    return _parsed_to_data(_EXTRACTORS[engine](code).get_parsed_file())
+
 
 def _main() -> None:
     import json  # noqa: PLC0415
@@ -286,7 +800,7 @@ def _main() -> None:
     """
 
     extractor = _ZigDocsExtractor(code)
-    print(json.dumps(extractor.get_docs(), indent=4))  # noqa: T201
+    print(json.dumps(_node_to_rows(extractor.get_docs()), indent=4))  # noqa: T201
 
 
 if __name__ == "__main__":
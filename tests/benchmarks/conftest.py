@@ -0,0 +1,233 @@
+"""Configuration and generated Zig corpora for the benchmarks."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from markdown import Markdown
+from mkdocs_autorefs import AutorefsExtension
+
+from mkdocstrings_handlers.zig import ZigConfig, ZigHandler
+from mkdocstrings_handlers.zig._internal import handler as handler_module
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+
+CORPUS_LINES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+"""Sizes of the generated corpora, in lines."""
+
+_BLOCK = """
+/// Structure number {index}.
+/// It holds a few `fields` and **methods**.
+pub const Struct{index} = struct {{
+    /// First field
+    first: u32,
+    // Regular comment.
+    /// Second field
+    second: [2]u8 = .{{ 0, 0 }},
+    undocumented: bool,
+
+    /// Nested structure
+    const Nested = struct {{
+        /// Value
+        value: ?*Struct{index},
+    }};
+
+    /// Method {index}
+    pub fn method(self: *Struct{index}, options: struct {{ flag: bool }}) !void {{
+        _ = self;
+        _ = options;
+    }}
+}};
+
+/// Generic factory {index}
+pub fn Factory{index}(comptime T: type) type {{
+    return struct {{
+        /// Wrapped value
+        value: T,
+    }};
+}}
+
+test "struct {index}" {{
+    try std.testing.expect(true);
+}}
+
+/// Constant {index}
+pub const constant{index}: u32 = {index};
+"""
+_BLOCK_LINES = _BLOCK.count("\n")
+_BLOCK_DECLARATIONS = 12
+"""Documented declarations of a block: structures, fields, functions and constants."""
+
+
+class Corpus:
+    """A generated Zig source file."""
+
+    def __init__(self, lines: int) -> None:
+        """Generate a corpus.
+
+        Parameters:
+            lines: The approximate number of lines.
+        """
+        blocks = max(1, lines // _BLOCK_LINES)
+        self.code = '//! Generated module.\nconst std = @import("std");\n' + "".join(
+            _BLOCK.format(index=index) for index in range(blocks)
+        )
+        """The source code."""
+        self.lines = self.code.count("\n")
+        """The number of lines."""
+        self.size = len(self.code.encode("utf-8"))
+        """The size in bytes."""
+        self.declarations = blocks * _BLOCK_DECLARATIONS
+        """The number of documented declarations."""
+
+
+def nested_source(depth: int, indent_unit: str = "    ") -> str:
+    """Generate a Zig module with structures nested `depth` levels deep.
+
+    Parameters:
+        depth: The nesting depth.
+        indent_unit: The indentation of each level. The size of the source is quadratic in the depth when it's not empty.
+
+    Returns:
+        The source code.
+    """
+    opening = []
+    closing = []
+    for level in range(depth):
+        indent = indent_unit * level
+        opening.append(
+            f"{indent}/// Structure at level {level}.\n"
+            f"{indent}pub const Level{level} = struct {{\n"
+            f"{indent}    /// Field of level {level}.\n"
+            f"{indent}    value: u32,\n"
+            f"{indent}    /// Method of level {level}.\n"
+            f"{indent}    pub fn get(self: Level{level}) u32 {{\n"
+            f"{indent}        return self.value;\n"
+            f"{indent}    }}\n",
+        )
+        closing.append(f"{indent}}};\n")
+    return "//! Deeply nested module.\n" + "".join(opening) + "".join(reversed(closing))
+
+
+def huge_container_source(declarations: int) -> str:
+    """Generate a Zig module with a single structure holding `declarations` documented fields and constants.
+
+    Parameters:
+        declarations: The number of declarations.
+
+    Returns:
+        The source code.
+    """
+    members = []
+    for index in range(declarations):
+        if index % 2:
+            members.append(f"    /// Constant {index}.\n    pub const constant{index}: u32 = {index};\n")
+        else:
+            members.append(f"    /// Field {index}.\n    field{index}: u32,\n")
+    return "//! Huge container.\n/// Huge structure.\npub const Huge = struct {\n" + "".join(members) + "};\n"
+
+
+def long_doc_source(doc_lines: int, block_lines: int) -> str:
+    """Generate a Zig module with constants documented by long runs of doc comments.
+
+    Parameters:
+        doc_lines: The total number of doc comment lines.
+        block_lines: The number of doc comment lines of each constant.
+
+    Returns:
+        The source code.
+    """
+    blocks = []
+    for index in range(max(1, doc_lines // block_lines)):
+        doc = "".join(f"/// Line {line} of constant {index}.\n" for line in range(block_lines))
+        blocks.append(f"{doc}pub const constant{index}: u32 = {index};\n")
+    return "//! Long doc blocks.\n" + "".join(blocks)
+
+
+def make_handler(base_dir: Path, **config: Any) -> ZigHandler:
+    """Create a handler ready to collect and render, outside of a MkDocs build.
+
+    Parameters:
+        base_dir: The base directory of the project.
+        **config: The handler configuration.
+
+    Returns:
+        The handler.
+    """
+    handler = ZigHandler(
+        config=ZigConfig.from_data(**config),
+        base_dir=base_dir,
+        theme="material",
+        custom_templates=None,
+        # MkDocs and mkdocstrings always enable these extensions.
+        mdx=["toc", AutorefsExtension()],
+        mdx_config={},
+    )
+    handler._update_env(Markdown(), config={})
+    return handler
+
+
+@pytest.fixture(name="handler")
+def fixture_handler(tmp_path: Path) -> ZigHandler:
+    """Return a handler instance.
+
+    Parameters:
+        tmp_path: Pytest fixture.
+
+    Returns:
+        A handler instance.
+    """
+    return make_handler(tmp_path)
+
+
+@pytest.fixture(name="corpus", params=list(CORPUS_LINES), scope="session")
+def fixture_corpus(request: pytest.FixtureRequest) -> Corpus:
+    """Return a generated corpus of each size.
+
+    Parameters:
+        request: Pytest fixture.
+
+    Returns:
+        The corpus.
+    """
+    return Corpus(CORPUS_LINES[request.param])
+
+
+@pytest.fixture(autouse=True)
+def fixture_clear_previous_extractors() -> Iterator[None]:
+    """Forget the parse trees kept between builds, so that each benchmark starts cold.
+
+    Yields:
+        Nothing.
+    """
+    handler_module._previous_extractors.clear()
+    yield
+    handler_module._previous_extractors.clear()
+
+
+def struct_tree_source(depth: int, breadth: int) -> str:
+    """Generate a Zig module with a tree of structures, each with `breadth` nested structures.
+
+    Parameters:
+        depth: The depth of the tree.
+        breadth: The number of structures nested in each structure.
+
+    Returns:
+        The source code.
+    """
+
+    def _struct(name: str, level: int) -> str:
+        indent = "    " * level
+        members = [
+            f"{indent}    /// Field of {name}.\n{indent}    value: u32,\n",
+            f"{indent}    /// Constant of {name}.\n{indent}    pub const size: usize = {level};\n",
+        ]
+        if level < depth:
+            members.extend(_struct(f"{name}_{index}", level + 1) for index in range(breadth))
+        return f"{indent}/// Structure {name}.\n{indent}pub const {name} = struct {{\n{''.join(members)}{indent}}};\n"
+
+    return "//! Tree of structures.\n" + _struct("Root", 0)
@@ -0,0 +1,36 @@
+"""Benchmarks of the collection of directories."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from tests.benchmarks.conftest import CORPUS_LINES, Corpus, make_handler
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+FILE_LINES = 500
+"""Size of each generated file, in lines."""
+
+
+@pytest.mark.parametrize("size", list(CORPUS_LINES))
+def test_collect_directory(benchmark: BenchmarkFixture, tmp_path: Path, size: str) -> None:
+    """Collect a directory of generated files, totalling 1k, 10k or 100k lines."""
+    code = Corpus(FILE_LINES).code
+    directory = tmp_path / "src"
+    for index in range(max(1, CORPUS_LINES[size] // FILE_LINES)):
+        path = directory / f"package{index % 10}" / f"module{index}.zig"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code, encoding="utf-8")
+
+    # A new handler is created for each round, like for each build.
+    modules = benchmark.pedantic(
+        lambda handler: handler.collect(str(directory), handler.get_options({})),
+        setup=lambda: ((make_handler(tmp_path),), {}),
+        rounds=5,
+    )
+    assert len(modules) == max(1, CORPUS_LINES[size] // FILE_LINES)
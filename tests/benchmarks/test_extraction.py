@@ -0,0 +1,119 @@
+"""Benchmarks of the documentation extraction."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from mkdocstrings_handlers.zig._internal.zig_docs_extractor import _EXTRACTORS
+from tests.benchmarks.conftest import huge_container_source, long_doc_source, nested_source
+
+if TYPE_CHECKING:
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+    from tests.benchmarks.conftest import Corpus
+
+
+def _record_throughput(benchmark: BenchmarkFixture, corpus: Corpus) -> None:
+    benchmark.extra_info["lines"] = corpus.lines
+    benchmark.extra_info["declarations"] = corpus.declarations
+    if benchmark.stats is not None:
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info["MB/s"] = round(corpus.size / mean / 1e6, 3)
+        benchmark.extra_info["declarations/s"] = round(corpus.declarations / mean)
+
+
+@pytest.mark.parametrize("engine", list(_EXTRACTORS))
+def test_extract_docs(benchmark: BenchmarkFixture, corpus: Corpus, engine: str) -> None:
+    """Parse a file and extract its docs."""
+    extractor = _EXTRACTORS[engine]
+    docs = benchmark(lambda: extractor(corpus.code).get_docs())
+    assert docs.children
+    _record_throughput(benchmark, corpus)
+
+
+def test_extract_docs_incrementally(benchmark: BenchmarkFixture, corpus: Corpus) -> None:
+    """Reparse a file after editing one of its doc comments."""
+    extractor = _EXTRACTORS["walk"]
+    edited = corpus.code.replace("/// Constant 0", "/// Edited constant 0", 1)
+
+    def _setup() -> tuple[tuple, dict]:
+        previous = extractor(corpus.code)
+        previous.get_docs()
+        return (), {"previous": previous}
+
+    docs = benchmark.pedantic(
+        lambda previous: extractor(edited, previous=previous).get_docs(),
+        setup=_setup,
+        rounds=5,
+    )
+    assert docs.children[2].doc == "Edited constant 0"
+    _record_throughput(benchmark, corpus)
+
+
+def test_extract_docs_after_body_edit(benchmark: BenchmarkFixture, corpus: Corpus) -> None:
+    """Reparse a file after editing a function body, which keeps the docs of the previous version."""
+    extractor = _EXTRACTORS["walk"]
+    edited = corpus.code.replace("_ = options;", "_ = options.flag;", 1)
+
+    def _setup() -> tuple[tuple, dict]:
+        previous = extractor(corpus.code)
+        previous.get_docs()
+        return (), {"previous": previous}
+
+    docs = benchmark.pedantic(
+        lambda previous: extractor(edited, previous=previous).get_docs(),
+        setup=_setup,
+        rounds=5,
+    )
+    assert docs.children
+    _record_throughput(benchmark, corpus)
+
+
+def test_extract_single_declaration(benchmark: BenchmarkFixture, corpus: Corpus) -> None:
+    """Extract the docs of the last declaration of a file."""
+    extractor = _EXTRACTORS["walk"](corpus.code)
+    name = f"Struct{corpus.declarations // 12 - 1}.Nested.value"
+    member = benchmark(extractor.get_member_docs, name)
+    assert member is not None
+
+
+@pytest.mark.parametrize("engine", list(_EXTRACTORS))
+@pytest.mark.parametrize("depth", [1_000, 5_000])
+def test_extract_deeply_nested_docs(benchmark: BenchmarkFixture, engine: str, depth: int) -> None:
+    """Extract the docs of structures nested deeper than the recursion limit."""
+    extractor = _EXTRACTORS[engine]
+    code = nested_source(depth, indent_unit="")
+    docs = benchmark(lambda: extractor(code).get_docs())
+    for _ in range(depth):
+        docs = docs.children[-1]
+    assert docs.name == f"Level{depth - 1}"
+    benchmark.extra_info["depth"] = depth
+
+
+@pytest.mark.parametrize("engine", list(_EXTRACTORS))
+def test_extract_huge_container(benchmark: BenchmarkFixture, engine: str) -> None:
+    """Extract the docs of a structure with a hundred thousand declarations."""
+    extractor = _EXTRACTORS[engine]
+    code = huge_container_source(100_000)
+    docs = benchmark.pedantic(lambda: extractor(code).get_docs(), rounds=3)
+    fields, *constants = docs.children[0].children
+    assert len(fields.children) + len(constants) == 100_000
+    benchmark.extra_info["declarations/s"] = round(100_000 / benchmark.stats.stats.mean) if benchmark.stats else None
+
+
+@pytest.mark.parametrize("engine", list(_EXTRACTORS))
+@pytest.mark.parametrize("block_lines", [10, 100, 1_000])
+def test_extract_long_doc_blocks(benchmark: BenchmarkFixture, engine: str, block_lines: int) -> None:
+    """Extract the docs of a file of 20k doc lines, in blocks of increasing length.
+
+    Doc comments are collected in a single forward pass, so the time per line doesn't grow with the blocks.
+    """
+    extractor = _EXTRACTORS[engine]
+    code = long_doc_source(20_000, block_lines)
+    docs = benchmark.pedantic(lambda: extractor(code).get_docs(), rounds=5)
+    assert len(docs.children) == 20_000 // block_lines
+    assert docs.children[-1].doc.count("\n") == block_lines - 1
+    benchmark.extra_info["block_lines"] = block_lines
+    benchmark.extra_info["doc lines/s"] = round(20_000 / benchmark.stats.stats.mean) if benchmark.stats else None
@@ -0,0 +1,36 @@
+"""Benchmarks of the import of the handler."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+DEFERRED_MODULES = ("tree_sitter", "tree_sitter_zig", "multiprocessing", "concurrent.futures.process")
+"""Modules that are only imported when Zig files are collected."""
+
+
+def _import_times() -> dict[str, int]:
+    """Import the handler in a new interpreter, and return the cumulative import time of each module, in µs."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mkdocstrings_handlers.zig"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines()[1:]:
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_import_handler(benchmark: BenchmarkFixture) -> None:
+    """Import the handler in a new interpreter, without loading the Zig grammar nor worker processes."""
+    times = benchmark.pedantic(_import_times, rounds=10)
+    assert not set(DEFERRED_MODULES) & times.keys()
+    # The time spent importing the handler itself, excluding mkdocstrings and its dependencies.
+    benchmark.extra_info["handler_import_us"] = times["mkdocstrings_handlers.zig"] - times.get("mkdocstrings", 0)
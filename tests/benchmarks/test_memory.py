@@ -0,0 +1,144 @@
+"""Benchmarks of the memory used by extracted docs."""
+
+from __future__ import annotations
+
+import tracemalloc
+from dataclasses import fields
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from mkdocstrings_handlers.zig._internal.nodes import Field, _node_from_rows, _node_to_rows
+from mkdocstrings_handlers.zig._internal.zig_docs_extractor import _EXTRACTORS, _ZigDocsExtractor
+from tests.benchmarks.conftest import Corpus, make_handler
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from pytest_benchmark.fixture import BenchmarkFixture
+    from tree_sitter import Node
+
+
+def _as_dicts(node: Any) -> dict[str, Any]:
+    # Nested dictionaries, as returned by the extractor before nodes were introduced.
+    data: dict[str, Any] = {} if isinstance(node, Field) else {"node_type": node.node_type}
+    for node_field in fields(node):
+        value = getattr(node, node_field.name)
+        if isinstance(value, list):
+            value = [_as_dicts(child) for child in value]
+        elif hasattr(value, "node_type"):
+            value = _as_dicts(value)
+        elif value is None:
+            continue
+        data[node_field.name] = value
+    return data
+
+
+def _allocated(build: Callable[[], Any], *, peak: bool = False) -> tuple[Any, int]:
+    tracemalloc.start()
+    try:
+        result = build()
+        return result, tracemalloc.get_traced_memory()[1 if peak else 0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_docs_memory(benchmark: BenchmarkFixture, corpus: Corpus) -> None:
+    """Compare the memory held by the extracted docs with the one of the same docs as nested dictionaries.
+
+    Both representations are built from the same strings, so only the containers are measured.
+    """
+    docs = benchmark(_ZigDocsExtractor(corpus.code).get_docs)
+    rows = _node_to_rows(docs)
+    _, nodes_size = _allocated(lambda: _node_from_rows(rows))
+    _, dicts_size = _allocated(lambda: _as_dicts(docs))
+    benchmark.extra_info["nodes_bytes"] = nodes_size
+    benchmark.extra_info["dicts_bytes"] = dicts_size
+    assert nodes_size < dicts_size
+
+
+class _ListExtractor(_ZigDocsExtractor):
+    # Visits the children of structures through lists, as before tree cursors were used.
+    def _get_members(self, node: Node) -> list[Node]:
+        return node.children
+
+
+def _extraction_memory(extractor: _ZigDocsExtractor) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        extractor.get_docs()
+        held, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return held, peak - held
+
+
+def test_extraction_transient_memory(benchmark: BenchmarkFixture, corpus: Corpus) -> None:
+    """Measure the memory allocated while extracting docs on top of the memory held by them.
+
+    Children of nodes are visited with cursors instead of lists, so the tree is walked without copying it.
+    The same extraction visiting children through lists is measured for comparison.
+    """
+    benchmark.pedantic(lambda extractor: extractor.get_docs(), setup=lambda: ((_ZigDocsExtractor(corpus.code),), {}))
+    held, transient = _extraction_memory(_ZigDocsExtractor(corpus.code))
+    list_held, list_transient = _extraction_memory(_ListExtractor(corpus.code))
+    benchmark.extra_info["held_bytes"] = held
+    benchmark.extra_info["transient_bytes"] = transient
+    benchmark.extra_info["list_held_bytes"] = list_held
+    benchmark.extra_info["list_transient_bytes"] = list_transient
+    assert transient < held
+    assert transient < list_transient
+
+
+@pytest.mark.parametrize("engine", list(_EXTRACTORS))
+def test_extraction_decoded_bytes(
+    benchmark: BenchmarkFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    corpus: Corpus,
+    engine: str,
+) -> None:
+    """Measure the bytes of the source decoded to strings while extracting docs.
+
+    Only the strings that end up in the docs are decoded, so less than the whole source is decoded.
+    Decoding the text of whole declarations, bodies included, decodes about twice the source.
+    """
+    extractor = _EXTRACTORS[engine]
+    docs = benchmark.pedantic(lambda: extractor(corpus.code).get_docs(), rounds=3)
+    decoded = []
+    decode = _ZigDocsExtractor._decode
+
+    def _counting_decode(self: _ZigDocsExtractor, start: int, end: int) -> str:
+        decoded.append(end - start)
+        return decode(self, start, end)
+
+    monkeypatch.setattr(_ZigDocsExtractor, "_decode", _counting_decode)
+    _, allocated = _allocated(extractor(corpus.code).get_docs)
+    assert docs.children
+    benchmark.extra_info["source_bytes"] = corpus.size
+    benchmark.extra_info["decoded_bytes"] = sum(decoded)
+    benchmark.extra_info["decoded_strings"] = len(decoded)
+    benchmark.extra_info["allocated_bytes"] = allocated
+    assert sum(decoded) < corpus.size
+
+
+def test_directory_peak_memory(benchmark: BenchmarkFixture, tmp_path: Path) -> None:
+    """Compare the peak memory of collecting and rendering a directory of 100k lines, with and without streaming."""
+    code = Corpus(500).code
+    directory = tmp_path / "src"
+    directory.mkdir()
+    for index in range(50):
+        (directory / f"module{index}.zig").write_text(code, encoding="utf-8")
+
+    def _build(**config: Any) -> str:
+        handler = make_handler(tmp_path, **config)
+        options = handler.get_options({})
+        return handler.render(handler.collect(str(directory), options), options)
+
+    html = benchmark.pedantic(_build, kwargs={"streaming": True}, rounds=1)
+    _, streamed_peak = _allocated(lambda: _build(streaming=True), peak=True)
+    _, materialized_peak = _allocated(_build, peak=True)
+    benchmark.extra_info["html_bytes"] = len(html)
+    benchmark.extra_info["streamed_peak_bytes"] = streamed_peak
+    benchmark.extra_info["materialized_peak_bytes"] = materialized_peak
+    assert streamed_peak < materialized_peak
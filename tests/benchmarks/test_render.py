@@ -0,0 +1,74 @@
+"""Benchmarks of the rendering of collected docs."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from mkdocstrings_handlers.zig._internal.handler import _rendered
+from tests.benchmarks.conftest import nested_source, struct_tree_source
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from mkdocstrings import CollectorItem
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+    from mkdocstrings_handlers.zig import ZigHandler, ZigOptions
+
+
+def _render_cold(benchmark: BenchmarkFixture, handler: ZigHandler, data: CollectorItem, options: ZigOptions) -> str:
+    """Benchmark rendering, forgetting the rendered HTML and the converted docs of the previous rounds."""
+
+    def _setup() -> None:
+        _rendered.clear()
+        handler._converted.clear()
+
+    return benchmark.pedantic(handler.render, args=(data, options), setup=_setup, rounds=10)
+
+
+@pytest.mark.parametrize("depth", [1, 10, 50])
+def test_render_nested_structs(benchmark: BenchmarkFixture, handler: ZigHandler, tmp_path: Path, depth: int) -> None:
+    """Render structures nested at various depths, repeated to get a meaningful amount of HTML."""
+    path = tmp_path / "nested.zig"
+    path.write_text(nested_source(depth) * (50 // depth), encoding="utf-8")
+    options = handler.get_options({})
+    data = handler.collect(str(path), options)
+    html = _render_cold(benchmark, handler, data, options)
+    assert html.count('class="func"') == depth * (50 // depth)
+
+
+@pytest.mark.parametrize("fields", [100, 1000])
+def test_render_many_fields(benchmark: BenchmarkFixture, handler: ZigHandler, tmp_path: Path, fields: int) -> None:
+    """Render structures with many documented fields, most of them sharing their docs."""
+    lines = [
+        f"    /// Field number {index % 10}, with *emphasis*.\n    field{index}: u32,\n" for index in range(fields)
+    ]
+    path = tmp_path / "fields.zig"
+    path.write_text("/// Many fields.\npub const Fields = struct {\n" + "".join(lines) + "};\n", encoding="utf-8")
+    options = handler.get_options({})
+    data = handler.collect(str(path), options)
+    html = _render_cold(benchmark, handler, data, options)
+    assert html.count("<tr>") == fields + 1
+
+
+def test_render_struct_tree(benchmark: BenchmarkFixture, handler: ZigHandler, tmp_path: Path) -> None:
+    """Render a tree of about a thousand nested structures, with fields and constants."""
+    path = tmp_path / "tree.zig"
+    path.write_text(struct_tree_source(depth=6, breadth=3), encoding="utf-8")
+    options = handler.get_options({})
+    data = handler.collect(str(path), options)
+    html = _render_cold(benchmark, handler, data, options)
+    assert html.count('class="struct"') == sum(3**level for level in range(7))
+
+
+def test_render_struct_tree_warm(benchmark: BenchmarkFixture, handler: ZigHandler, tmp_path: Path) -> None:
+    """Render again the tree of structures, as a later build does when its docs did not change."""
+    path = tmp_path / "tree.zig"
+    path.write_text(struct_tree_source(depth=6, breadth=3), encoding="utf-8")
+    options = handler.get_options({})
+    data = handler.collect(str(path), options)
+    expected = handler.render(data, options)
+    html = benchmark(handler.render, data, options)
+    assert html == expected
@@ -0,0 +1,868 @@
+"""Tests for the handler collection logic."""
+
+from __future__ import annotations
+
+import inspect
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from markdown import Markdown
+from markdown.treeprocessors import Treeprocessor
+from mkdocs.exceptions import PluginError
+from mkdocs_autorefs import AutorefsExtension
+from mkdocstrings import CollectionError, Inventory
+
+from mkdocstrings_handlers.zig import Const, Fields, Function, Module, Struct, ZigConfig, ZigHandler, ZigOptions
+from mkdocstrings_handlers.zig._internal import handler as handler_module
+from tests.test_zig_parser import _deeply_nested_source
+
+if TYPE_CHECKING:
+    from xml.etree.ElementTree import Element
+
+OPTIONS = ZigOptions.from_data()
+
+ZIG_CODE = """
+//! Module docs
+
+/// A 2D point struct.
+const Point = struct {
+    /// horizontal coordinate
+    x: i32,
+};
+
+/// Adds two numbers.
+fn add(a: i32, b: i32) i32 {
+    return a + b;
+}
+"""
+
+
+def _make_handler(base_dir: Path, **config: Any) -> ZigHandler:
+    return ZigHandler(
+        config=ZigConfig.from_data(**config),
+        base_dir=base_dir,
+        theme="material",
+        custom_templates=None,
+        mdx=["toc", AutorefsExtension()],
+        mdx_config={},
+    )
+
+
+@pytest.fixture(name="zig_file")
+def fixture_zig_file(tmp_path: Path) -> Path:
+    """Return the path of a small Zig source file.
+
+    Parameters:
+        tmp_path: Pytest fixture.
+
+    Returns:
+        The path of the file.
+    """
+    path = tmp_path / "src" / "root.zig"
+    path.parent.mkdir()
+    path.write_text(ZIG_CODE, encoding="utf-8")
+    return path
+
+
+def test_disk_cache_skips_parsing(tmp_path: Path, zig_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unchanged files are loaded from the disk cache by later builds."""
+    cold = _make_handler(tmp_path, cache=True).collect(str(zig_file), OPTIONS)
+    assert list((tmp_path / ".cache" / "mkdocstrings-zig").rglob("*.json"))
+
+    def _fail(code: str) -> None:  # noqa: ARG001
+        raise AssertionError("the file should not be parsed again")
+
+    handler = _make_handler(tmp_path, cache=True)
+    monkeypatch.setattr(handler, "_extractor", _fail)
+    warm = handler.collect(str(zig_file), OPTIONS)
+    assert warm == cold
+
+
+def test_disk_cache_invalidated_on_change(tmp_path: Path, zig_file: Path) -> None:
+    """Changed files are parsed again."""
+    _make_handler(tmp_path, cache=True, cache_dir="cache").collect(str(zig_file), OPTIONS)
+    zig_file.write_text(ZIG_CODE.replace("Adds two numbers.", "Sums two numbers."), encoding="utf-8")
+    (module,) = _make_handler(tmp_path, cache=True, cache_dir="cache").collect(str(zig_file), OPTIONS)
+    assert module.children[1].doc == "Sums two numbers."
+    assert len(list((tmp_path / "cache").rglob("*.json"))) == 2
+
+
+def test_disk_cache_pruned_on_teardown(tmp_path: Path, zig_file: Path) -> None:
+    """Cache entries unused for a month are deleted when a build ends, other entries are kept."""
+    other_file = zig_file.with_name("other.zig")
+    other_file.write_text(ZIG_CODE.replace("Adds two numbers.", "Sums two numbers."), encoding="utf-8")
+    handler = _make_handler(tmp_path, cache=True, cache_dir="cache")
+    handler.collect(str(zig_file.parent), OPTIONS)
+    handler.teardown()
+    entries = sorted((tmp_path / "cache").rglob("*.json"))
+    assert len(entries) == 2
+
+    # Entries are kept when a build doesn't read them, and reading them keeps them longer.
+    month_ago = time.time() - 31 * 24 * 60 * 60
+    for entry in entries:
+        os.utime(entry, (month_ago, month_ago))
+    handler = _make_handler(tmp_path, cache=True, cache_dir="cache")
+    (module,) = handler.collect(str(zig_file), OPTIONS)
+    handler.teardown()
+    (kept,) = (tmp_path / "cache").rglob("*.json")
+    assert kept.stat().st_mtime > month_ago
+    assert module.children[1].doc == "Adds two numbers."
+
+    handler = _make_handler(tmp_path, cache=True, cache_dir="cache")
+    handler.collect(str(other_file), OPTIONS)
+    handler.teardown()
+    assert len(list((tmp_path / "cache").rglob("*.json"))) == 2
+
+
+def test_modules_memoized_across_identifiers(
+    tmp_path: Path,
+    zig_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Files reached through several identifiers are parsed once per build."""
+    parsed_codes = []
+    handler = _make_handler(tmp_path)
+    extractor = handler._extractor
+
+    def _counting_extractor(code: str, **kwargs: Any) -> Any:
+        parsed_codes.append(code)
+        return extractor(code, **kwargs)
+
+    monkeypatch.setattr(handler, "_extractor", _counting_extractor)
+    (from_file,) = handler.collect(str(zig_file), OPTIONS)
+    (from_dir,) = handler.collect(str(zig_file.parent), OPTIONS)
+    handler.collect(str(zig_file), OPTIONS)
+    assert len(parsed_codes) == 1
+    assert from_file == from_dir
+    assert handler.get_aliases(f"{zig_file}::Point") == ("root.Point",)
+
+    zig_file.write_text(ZIG_CODE + "\n/// Answer.\nconst answer = 42;\n", encoding="utf-8")
+    os.utime(zig_file, ns=(zig_file.stat().st_atime_ns, zig_file.stat().st_mtime_ns + 1_000_000))
+    (updated,) = handler.collect(str(zig_file), OPTIONS)
+    assert len(parsed_codes) == 2
+    assert updated.children[-1].name == "answer"
+
+
+def test_parallel_collection_matches_sequential(tmp_path: Path) -> None:
+    """Parsing directories in worker processes gives the same, ordered output."""
+    for index in range(5):
+        path = tmp_path / "src" / f"module{index}.zig"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(ZIG_CODE.replace("Adds", f"Adds {index}"), encoding="utf-8")
+
+    sequential = _make_handler(tmp_path).collect(str(tmp_path / "src"), OPTIONS)
+    handler = _make_handler(tmp_path, jobs=2)
+    try:
+        parallel = handler.collect(str(tmp_path / "src"), OPTIONS)
+    finally:
+        handler.teardown()
+    assert parallel == sequential
+    assert [module.name for module in parallel] == sorted(module.name for module in parallel)
+
+
+def test_negative_jobs_rejected(tmp_path: Path) -> None:
+    """A negative number of jobs is rejected, with or without Pydantic validating options."""
+    # Pydantic validation errors are value errors.
+    with pytest.raises((PluginError, ValueError), match="jobs"):
+        _make_handler(tmp_path, jobs=-1)
+
+
+def test_collect_single_declaration(tmp_path: Path, zig_file: Path) -> None:
+    """Identifiers can select a single declaration of a file."""
+    handler = _make_handler(tmp_path)
+    (point,) = handler.collect(f"{zig_file}::Point", OPTIONS)
+    (module,) = handler.collect(str(zig_file), OPTIONS)
+    assert point == Module(path=str(zig_file), name="Point", member=module.children[0])
+
+    (field,) = handler.collect(f"{zig_file}::Point.x", OPTIONS)
+    assert field.member == Fields(children=module.children[0].children[0].children)
+
+    with pytest.raises(CollectionError, match=r"Point\.z"):
+        handler.collect(f"{zig_file}::Point.z", OPTIONS)
+
+
+def test_markdown_conversions_memoized(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Identical docs are converted once, unless they contain headings."""
+    handler = _make_handler(tmp_path)
+    handler._update_env(Markdown(), config={})
+    converted = []
+    convert = handler.md.convert
+
+    def _counting_convert(text: str) -> str:
+        converted.append(text)
+        return convert(text)
+
+    monkeypatch.setattr(handler.md, "convert", _counting_convert)
+    first = handler.do_convert_markdown("Some *docs*.", 2, "root")
+    assert handler.do_convert_markdown("Some *docs*.", 2, "root") == first == "<p>Some <em>docs</em>.</p>"
+    handler.do_convert_markdown("Some *docs*.", 3, "root")
+    assert len(converted) == 2
+
+    handler.do_convert_markdown("# Title", 2, "root")
+    handler.do_convert_markdown("# Title", 2, "root")
+    assert len(converted) == 4
+
+
+class _PageLinks(Treeprocessor):
+    """Prefix links with the current page, like the `relpath` processor of MkDocs makes them relative to it."""
+
+    def __init__(self, file: Any, files: Any, config: Any) -> None:
+        super().__init__()
+        self.file = file
+        self.files = files
+        self.config = config
+
+    def run(self, root: Element) -> None:
+        for link in root.iter("a"):
+            link.set("href", f"{self.file.src_uri}:{link.get('href')}")
+
+
+def test_markdown_conversions_memoized_per_page(tmp_path: Path) -> None:
+    """Relative links are converted for each page, memoized conversions are not shared between pages."""
+    handler = _make_handler(tmp_path)
+    for page in ("a.md", "b.md", "a.md"):
+        md = Markdown()
+        md.treeprocessors.register(_PageLinks(SimpleNamespace(src_uri=page), None, None), "relpath", 0)
+        handler._update_env(md, config={})
+        html = handler.do_convert_markdown("See [other](other.md).", 2, "root")
+        assert html == f'<p>See <a href="{page}:other.md">other</a>.</p>'
+
+
+def test_render_reuses_compiled_templates(tmp_path: Path, zig_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Templates are compiled once, and shared with the handlers of later builds."""
+    handler = _make_handler(tmp_path)
+    handler._update_env(Markdown(), config={})
+    html = handler.render(handler.collect(str(zig_file), OPTIONS), OPTIONS)
+    assert "struct Point" in html
+    assert "horizontal coordinate" in html
+    assert "fn add" in html
+
+    compiled = []
+    handler = _make_handler(tmp_path)
+    monkeypatch.setattr(handler.env, "compile", lambda *args, **kwargs: compiled.append(args))
+    handler._update_env(Markdown(), config={})
+    assert handler.render(handler.collect(str(zig_file), OPTIONS), OPTIONS) == html
+    assert not compiled
+
+    # Templates are loaded for the first page only.
+    listed = []
+    monkeypatch.setattr(handler.env, "list_templates", lambda *args, **kwargs: listed.append(args))
+    handler._update_env(Markdown(), config={})
+    assert not listed
+    assert handler.render(handler.collect(str(zig_file), OPTIONS), OPTIONS) == html
+
+
+def test_environment_set_up_once_across_threads(
+    tmp_path: Path,
+    zig_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Pages rendered from several threads wait for the environment to be set up by the first one."""
+    expected = _make_handler(tmp_path)
+    expected._update_env(Markdown(), config={})
+    html = expected.render(expected.collect(str(zig_file), OPTIONS), OPTIONS)
+
+    # Pages are rendered again rather than read from the HTML rendered above.
+    monkeypatch.setattr(handler_module, "_rendered", {})
+    handler = _make_handler(tmp_path)
+    modules = handler.collect(str(zig_file), OPTIONS)
+    # Only count the templates listed by the set up, not by the salt of the rendered HTML.
+    assert handler._render_salt
+    get_template = handler.env.get_template
+    listed = []
+    list_templates = handler.env.list_templates
+
+    def _slow_get_template(*args: Any, **kwargs: Any) -> Any:
+        time.sleep(0.001)
+        return get_template(*args, **kwargs)
+
+    def _recording_list_templates(*args: Any, **kwargs: Any) -> list[str]:
+        listed.append(args)
+        return list_templates(*args, **kwargs)
+
+    monkeypatch.setattr(handler.env, "get_template", _slow_get_template)
+    monkeypatch.setattr(handler.env, "list_templates", _recording_list_templates)
+
+    def _render_page(_: int) -> str:
+        handler._update_env(Markdown(), config={})
+        return handler.render(modules, OPTIONS)
+
+    with ThreadPoolExecutor(4) as executor:
+        assert list(executor.map(_render_page, range(4))) == [html] * 4
+    assert len(listed) == 1
+
+
+def test_deeply_nested_module_end_to_end(tmp_path: Path) -> None:
+    """Modules nested deeper than the recursion limit are collected, cached, indexed and rendered."""
+    depth = 300
+    path = tmp_path / "deep.zig"
+    path.write_text(_deeply_nested_source(depth), encoding="utf-8")
+    # The second build loads the docs from the disk cache.
+    for _ in range(2):
+        handler = _make_handler(tmp_path, cache=True)
+        handler._update_env(Markdown(), config={})
+        limit = sys.getrecursionlimit()
+        # Leave fewer frames than there are levels of nesting, so that any recursion over members fails.
+        sys.setrecursionlimit(len(inspect.stack(0)) + depth // 2)
+        try:
+            html = handler.render(handler.collect(str(path), OPTIONS), OPTIONS)
+        finally:
+            sys.setrecursionlimit(limit)
+        assert f"Value {depth - 1}." in html
+        headings = handler.get_headings()
+        assert len(headings) == 4 * depth + 1
+        assert headings[-1].attrib["id"].endswith(f"Level{depth - 1}.Make.return_struct.value")
+        assert all(handler.get_aliases(heading.attrib["id"]) for heading in headings)
+    assert list((tmp_path / ".cache" / "mkdocstrings-zig").rglob("*.json"))
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_streaming_collection(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, jobs: int) -> None:
+    """Streamed directories are parsed while rendered, and nothing, not even their HTML, is kept after rendering."""
+    for index in range(5):
+        path = tmp_path / "src" / f"module{index}.zig"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(ZIG_CODE.replace("Adds", f"Adds {index}"), encoding="utf-8")
+
+    handler = _make_handler(tmp_path)
+    handler._update_env(Markdown(), config={})
+    expected = handler.render(handler.collect(str(tmp_path / "src"), OPTIONS), OPTIONS)
+    handler_module._previous_extractors.clear()
+
+    handler = _make_handler(tmp_path, streaming=True, jobs=jobs)
+    handler._update_env(Markdown(), config={})
+    parsed_codes = []
+    extractor = handler._extractor
+
+    def _counting_extractor(code: str, **kwargs: Any) -> Any:
+        parsed_codes.append(code)
+        return extractor(code, **kwargs)
+
+    monkeypatch.setattr(handler, "_extractor", _counting_extractor)
+    monkeypatch.setattr(handler_module, "_rendered", {})
+    try:
+        modules = handler.collect(str(tmp_path / "src"), OPTIONS)
+        assert not parsed_codes
+        assert len(modules) == 5
+        assert handler.render(modules, OPTIONS) == expected
+        assert not handler_module._rendered
+    finally:
+        handler.teardown()
+    assert len(parsed_codes) == (5 if jobs == 1 else 0)
+    assert not handler._modules
+    assert not any(path.parent == tmp_path / "src" for path in handler_module._previous_extractors)
+
+
+def test_rendered_declarations_registered_for_inventory(tmp_path: Path, zig_file: Path) -> None:
+    """Every rendered declaration gets a unique anchor, with a role to register it in the inventory."""
+    handler = _make_handler(tmp_path)
+    handler._update_env(Markdown(), config={})
+    handler.render(handler.collect(str(zig_file), OPTIONS), OPTIONS)
+    headings = {heading.get("id"): heading.get("data-role") for heading in handler.get_headings()}
+    assert headings == {
+        str(zig_file): "module",
+        f"{zig_file}::Point": "struct",
+        f"{zig_file}::Point.x": "field",
+        f"{zig_file}::add": "function",
+    }
+
+    handler.render(handler.collect(f"{zig_file}::Point.x", OPTIONS), OPTIONS)
+    assert [heading.get("id") for heading in handler.get_headings()] == [f"{zig_file}::Point.x"]
+
+
+def test_load_inventory(tmp_path: Path) -> None:
+    """Inventories are configured as URLs or mappings, and filtered by domain when loaded."""
+    inventory = Inventory()
+    inventory.register(name="src/root.zig::Point", domain="zig", role="struct", uri="api/#src/root.zig::Point")
+    inventory.register(name="pkg.Point", domain="py", role="class", uri="py/#pkg.Point")
+    in_file = BytesIO(inventory.format_sphinx())
+
+    items = list(ZigHandler.load_inventory(in_file, "https://example.org/docs/objects.inv"))
+    assert items == [("src/root.zig::Point", "https://example.org/docs/api/#src/root.zig::Point")]
+
+    handler = _make_handler(
+        tmp_path,
+        inventories=[
+            "https://example.org/docs/objects.inv",
+            {"url": "https://example.org/other/objects.inv", "base_url": "https://example.org/other/latest"},
+        ],
+    )
+    assert handler.get_inventory_urls() == [
+        ("https://example.org/docs/objects.inv", {}),
+        ("https://example.org/other/objects.inv", {"base_url": "https://example.org/other/latest"}),
+    ]
+
+
+def test_anchor_aliases(tmp_path: Path, zig_file: Path) -> None:
+    """The anchors of collected declarations are their identifiers, with their qualified names as aliases."""
+    handler = _make_handler(tmp_path)
+    assert handler.get_aliases(f"{zig_file}::Point") == ()
+
+    handler.collect(f"{zig_file}::Point.x", OPTIONS)
+    assert handler.get_aliases(f"{zig_file}::Point.x") == ("root.Point.x",)
+    assert handler.get_aliases(f"{zig_file}::Point") == ()
+
+    handler.collect(str(zig_file.parent), OPTIONS)
+    assert handler.get_aliases(str(zig_file)) == ("root",)
+    assert handler.get_aliases(f"{zig_file}::Point") == ("root.Point",)
+    assert handler.get_aliases(f"{zig_file}::add") == ("root.add",)
+
+    handler._update_env(Markdown(), config={})
+    handler.render(handler.collect(str(zig_file), OPTIONS), OPTIONS)
+    anchors = [heading.attrib["id"] for heading in handler.get_headings()]
+    assert anchors[0] == str(zig_file)
+    for anchor in anchors[1:]:
+        dotted_name = anchor.removeprefix(f"{zig_file}::")
+        assert handler.get_aliases(anchor) == (f"root.{dotted_name}",)
+
+
+@pytest.mark.parametrize("engine", ["walk", "query"])
+def test_concurrent_collection_and_rendering(tmp_path: Path, engine: str) -> None:
+    """Collecting and rendering the same tree from many threads gives the same output as one thread."""
+    for index in range(4):
+        path = tmp_path / "src" / f"module{index}.zig"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(ZIG_CODE.replace("Adds", f"Adds {index}") * 10, encoding="utf-8")
+    identifiers = [str(tmp_path / "src"), str(tmp_path / "src" / "module1.zig"), f"{tmp_path}/src/module2.zig::Point.x"]
+
+    def _render_pages(handler: ZigHandler) -> list[tuple[str, list[tuple[str | None, str | None]]]]:
+        # Like the mkdocstrings extension, each page updates the environment before rendering.
+        handler._update_env(Markdown(), config={})
+        pages = []
+        for identifier in identifiers:
+            html = handler.render(handler.collect(identifier, OPTIONS), OPTIONS)
+            assert handler.outer_layer
+            headings = [(heading.get("id"), heading.get("data-role")) for heading in handler.get_headings()]
+            pages.append((html, headings))
+        return pages
+
+    expected = _render_pages(_make_handler(tmp_path, engine=engine))
+    handler_module._previous_extractors.clear()
+
+    handler = _make_handler(tmp_path, engine=engine)
+    threads = 8
+    barrier = threading.Barrier(threads)
+
+    def _render_pages_together() -> list[tuple[str, list[tuple[str | None, str | None]]]]:
+        barrier.wait()
+        return _render_pages(handler)
+
+    with ThreadPoolExecutor(threads) as executor:
+        results = [executor.submit(_render_pages_together) for _ in range(threads)]
+        assert all(result.result() == expected for result in results)
+
+
+def test_import_defers_zig_grammar(tmp_path: Path, zig_file: Path) -> None:
+    """Importing the handler doesn't load tree-sitter, which is only loaded when collecting Zig files."""
+    script = f"""
+import sys
+from mkdocstrings_handlers.zig import ZigConfig, ZigHandler, ZigOptions
+assert "tree_sitter" not in sys.modules
+handler = ZigHandler(ZigConfig.from_data(), base_dir=None, theme="material", custom_templates=None, mdx=[], mdx_config={{}})
+assert "tree_sitter" not in sys.modules
+handler.collect({str(zig_file)!r}, ZigOptions.from_data())
+assert "tree_sitter" in sys.modules
+"""
+    subprocess.run([sys.executable, "-c", script], cwd=tmp_path, check=True)  # noqa: S603
+
+
+def _write_zig_files(directory: Path, files: dict[str, str]) -> None:
+    for name, code in files.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code, encoding="utf-8")
+
+
+def test_directory_discovery_with_globs(tmp_path: Path) -> None:
+    """Build artifacts are never documented, and files can be included or excluded with globs."""
+    _write_zig_files(
+        tmp_path / "src",
+        dict.fromkeys(
+            (
+                "root.zig",
+                "sub/util.zig",
+                "sub/util_test.zig",
+                "vendor/lib.zig",
+                "zig-cache/o/cached.zig",
+                ".zig-cache/o/cached.zig",
+                "zig-out/generated.zig",
+            ),
+            ZIG_CODE,
+        ),
+    )
+
+    def _paths(**config: Any) -> list[str]:
+        modules = _make_handler(tmp_path, **config).collect(str(tmp_path / "src"), OPTIONS)
+        return [Path(module.path).relative_to(tmp_path / "src").as_posix() for module in modules]
+
+    assert _paths() == ["root.zig", "sub/util.zig", "sub/util_test.zig", "vendor/lib.zig"]
+    assert _paths(exclude=["vendor/*", "*_test.zig"]) == ["root.zig", "sub/util.zig"]
+    assert _paths(include=["sub/*"]) == ["sub/util.zig", "sub/util_test.zig"]
+
+
+def test_directory_discovery_from_build_graph(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """With build discovery, only the root source files of `build.zig` and the files they import are documented."""
+    build_script = """
+    const std = @import("std");
+    pub fn build(b: *std.Build) void {
+        const lib = b.createModule(.{ .root_source_file = b.path("src/root.zig") });
+        const exe = b.createModule(.{ .root_source_file = b.path("src/main.zig") });
+        exe.addImport("lib", lib);
+    }
+    """
+    imports = 'const util = @import("util.zig");\nconst deep = @import("sub/deep.zig");\n'
+    _write_zig_files(
+        tmp_path,
+        {
+            "build.zig": build_script,
+            "src/root.zig": imports + ZIG_CODE,
+            "src/main.zig": 'const lib = @import("lib");\nconst util = @import("util.zig");\n' + ZIG_CODE,
+            "src/util.zig": ZIG_CODE,
+            "src/sub/deep.zig": 'const util = @import("../util.zig");\n' + ZIG_CODE,
+            "src/fixtures/unused.zig": ZIG_CODE,
+            "src/missing_import.zig": 'const gone = @import("gone.zig");\n',
+        },
+    )
+    monkeypatch.chdir(tmp_path)
+    handler = _make_handler(tmp_path, discovery="build")
+    parsed_codes = []
+    extractor = handler._extractor
+
+    def _counting_extractor(code: str, **kwargs: Any) -> Any:
+        parsed_codes.append(code)
+        return extractor(code, **kwargs)
+
+    monkeypatch.setattr(handler, "_extractor", _counting_extractor)
+    modules = handler.collect("src", OPTIONS)
+    assert [module.path for module in modules] == ["src/main.zig", "src/root.zig", "src/sub/deep.zig", "src/util.zig"]
+    # Each file is parsed once, the build script included.
+    assert len(parsed_codes) == 5
+    assert [module.path for module in handler.collect("src", OPTIONS)] == [module.path for module in modules]
+
+    handler = _make_handler(tmp_path, discovery="build", exclude=["sub/*"])
+    assert [module.path for module in handler.collect("src", OPTIONS)] == [
+        "src/main.zig",
+        "src/root.zig",
+        "src/util.zig",
+    ]
+
+
+def _record_parsed_codes(handler: ZigHandler, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    parsed_codes = []
+    extractor = handler._extractor
+
+    def _recording_extractor(code: str, **kwargs: Any) -> Any:
+        parsed_codes.append(code)
+        return extractor(code, **kwargs)
+
+    monkeypatch.setattr(handler, "_extractor", _recording_extractor)
+    return parsed_codes
+
+
+def test_build_discovery_reads_imports_from_extracted_docs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Files found from `build.zig` are parsed by the workers, or loaded from the disk cache, not in-process."""
+    build_script = """
+    pub fn build(b: *std.Build) void {
+        _ = b.createModule(.{ .root_source_file = b.path("src/root.zig") });
+        _ = b.createModule(.{ .root_source_file = b.path("src/main.zig") });
+    }
+    """
+    _write_zig_files(
+        tmp_path,
+        {
+            "build.zig": build_script,
+            "src/root.zig": 'const a = @import("a.zig");\n' + ZIG_CODE,
+            "src/main.zig": 'const b = @import("b.zig");\n' + ZIG_CODE,
+            "src/a.zig": 'const c = @import("c.zig");\n' + ZIG_CODE,
+            "src/b.zig": 'const d = @import("d.zig");\n' + ZIG_CODE,
+            "src/c.zig": ZIG_CODE,
+            "src/d.zig": ZIG_CODE,
+        },
+    )
+    monkeypatch.chdir(tmp_path)
+    # The first build parses the files in worker processes, the second one loads them from the disk cache.
+    for jobs in (2, 1):
+        monkeypatch.setattr(handler_module, "_previous_extractors", {})
+        handler = _make_handler(tmp_path, discovery="build", jobs=jobs, cache=True)
+        parsed_codes = _record_parsed_codes(handler, monkeypatch)
+        modules = handler.collect("src", OPTIONS)
+        handler.teardown()
+        assert [module.path for module in modules] == [
+            f"src/{name}.zig" for name in ("a", "b", "c", "d", "main", "root")
+        ]
+        assert parsed_codes == [build_script]
+
+
+def test_follow_imports(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Re-exported files and declarations are documented under their public names, parsing each file once."""
+    _write_zig_files(
+        tmp_path / "src",
+        {
+            "root.zig": """//! Root docs
+/// Geometry module.
+pub const geometry = @import("geometry.zig");
+/// The point type.
+pub const Point = @import("geometry.zig").Point;
+pub const plus = @import("math.zig").add;
+/// Not found.
+pub const Missing = @import("math.zig").Missing;
+const math = @import("math.zig");
+pub const cycle = @import("cycle.zig");
+""",
+            "geometry.zig": """//! Geometry.
+/// A point.
+pub const Point = struct {
+    /// horizontal coordinate
+    x: i32,
+};
+pub const math = @import("math.zig");
+""",
+            "math.zig": "/// Adds two numbers.\npub fn add(a: i32, b: i32) i32 {\n    return a + b;\n}\n",
+            "cycle.zig": '//! Cycle.\npub const root = @import("root.zig");\n/// A constant.\npub const c = 1;\n',
+        },
+    )
+    root = tmp_path / "src" / "root.zig"
+    handler = _make_handler(tmp_path)
+    parsed_codes = []
+    extractor = handler._extractor
+
+    def _counting_extractor(code: str, **kwargs: Any) -> Any:
+        parsed_codes.append(code)
+        return extractor(code, **kwargs)
+
+    monkeypatch.setattr(handler, "_extractor", _counting_extractor)
+    (module,) = handler.collect(str(root), ZigOptions.from_data(follow_imports=True))
+    assert len(parsed_codes) == 4
+
+    missing, geometry, point, plus, cycle = module.children
+    assert isinstance(missing, Const)
+    assert isinstance(geometry, Struct)
+    assert (geometry.name, geometry.doc) == ("geometry", "Geometry module.")
+    assert [child.name for child in geometry.children] == ["Point", "math"]  # type: ignore[union-attr]
+    assert isinstance(point, Struct)
+    assert (point.name, point.short_signature, point.doc) == ("Point", "pub const Point", "The point type.")
+    assert isinstance(point.children[0], Fields)
+    assert isinstance(plus, Function)
+    assert (plus.name, plus.doc) == ("plus", "Adds two numbers.")
+    # The cycle back to the root file is cut.
+    assert isinstance(cycle, Struct)
+    assert (cycle.doc, [child.name for child in cycle.children]) == ("Cycle.", ["c"])  # type: ignore[union-attr]
+    assert handler.get_aliases(f"{root}::geometry.Point.x") == ("root.geometry.Point.x",)
+
+    (cycle_module,) = handler.collect(str(tmp_path / "src" / "cycle.zig"), ZigOptions.from_data(follow_imports=True))
+    assert [child.name for child in cycle_module.children] == ["c", "root"]
+    assert len(parsed_codes) == 4
+
+    (module,) = handler.collect(str(root), OPTIONS)
+    assert [child.name for child in module.children] == ["Point", "Missing"]
+
+
+def test_follow_imports_without_parsing_in_process(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Re-exports are extracted with the docs: imported files are parsed by workers, later builds parse nothing."""
+    root_code = (
+        '/// Geometry.\npub const geometry = @import("geometry.zig");\npub const plus = @import("math.zig").add;\n'
+    )
+    _write_zig_files(
+        tmp_path / "src",
+        {
+            "root.zig": root_code,
+            "geometry.zig": ZIG_CODE,
+            "math.zig": "/// Adds two numbers.\npub fn add(a: i32, b: i32) i32 {\n    return a + b;\n}\n",
+        },
+    )
+    root = str(tmp_path / "src" / "root.zig")
+    options = ZigOptions.from_data(follow_imports=True)
+    monkeypatch.setattr(handler_module, "_previous_extractors", {})
+    handler = _make_handler(tmp_path, cache=True, jobs=2)
+    parsed_codes = _record_parsed_codes(handler, monkeypatch)
+    modules = handler.collect(root, options)
+    handler.teardown()
+    assert [child.name for child in modules[0].children] == ["geometry", "plus"]
+    assert parsed_codes == [root_code]
+
+    monkeypatch.setattr(handler_module, "_previous_extractors", {})
+    handler = _make_handler(tmp_path, cache=True)
+    parsed_codes = _record_parsed_codes(handler, monkeypatch)
+    assert handler.collect(root, options) == modules
+    assert not parsed_codes
+
+
+def test_rendered_modules_reused_across_builds(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Later builds only render the modules whose docs changed, and register the same headings."""
+    for index in range(3):
+        path = tmp_path / "src" / f"module{index}.zig"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(ZIG_CODE.replace("Adds", f"Adds {index}"), encoding="utf-8")
+
+    def _render(handler: ZigHandler) -> tuple[str, list[str | None], list[list[Module]]]:
+        handler._update_env(Markdown(), config={})
+        template = handler.env.get_template("root.html.jinja")
+        rendered: list[list[Module]] = []
+        render = template.render
+
+        def _recording_render(*args: Any, **kwargs: Any) -> str:
+            rendered.append(kwargs["data"])
+            return render(*args, **kwargs)
+
+        monkeypatch.setattr(template, "render", _recording_render)
+        html = handler.render(handler.collect(str(tmp_path / "src"), OPTIONS), OPTIONS)
+        handler.teardown()
+        return html, [heading.get("id") for heading in handler.get_headings()], rendered
+
+    html, headings, rendered = _render(_make_handler(tmp_path))
+    assert len(rendered) == 3
+    assert _render(_make_handler(tmp_path)) == (html, headings, [])
+
+    edited = tmp_path / "src" / "module1.zig"
+    edited.write_text(ZIG_CODE.replace("Adds", "Sums"), encoding="utf-8")
+    os.utime(edited, ns=(edited.stat().st_atime_ns, edited.stat().st_mtime_ns + 1_000_000))
+    new_html, new_headings, rendered = _render(_make_handler(tmp_path))
+    assert [module.path for (module,) in rendered] == [str(edited)]
+    assert "Sums two numbers." in new_html
+    assert new_headings == headings
+    assert len(handler_module._rendered) == 3
+
+
+def test_teardown_forgets_files_not_parsed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The parse trees and locks of files not parsed by the last build are forgotten."""
+    monkeypatch.setattr(handler_module, "_previous_extractors", {})
+    monkeypatch.setattr(handler_module, "_file_locks", {})
+    paths = []
+    for index in range(3):
+        path = tmp_path / "src" / f"module{index}.zig"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(ZIG_CODE.replace("Adds", f"Adds {index}"), encoding="utf-8")
+        paths.append(path.resolve())
+
+    handler = _make_handler(tmp_path)
+    handler.collect(str(tmp_path / "src"), OPTIONS)
+    handler.teardown()
+    assert set(handler_module._previous_extractors) == set(handler_module._file_locks) == set(paths)
+
+    paths[2].unlink()
+    handler = _make_handler(tmp_path)
+    handler.collect(str(tmp_path / "src" / "module0.zig"), OPTIONS)
+    handler.collect(f"{tmp_path}/src/module1.zig::Point", OPTIONS)
+    handler.teardown()
+    assert set(handler_module._previous_extractors) == set(handler_module._file_locks) == set(paths[:2])
+
+
+def test_body_edits_skip_extraction_and_rendering(
+    tmp_path: Path,
+    zig_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Edits that don't change the documented surface of a file reuse its docs and its HTML."""
+    handler = _make_handler(tmp_path)
+    handler._update_env(Markdown(), config={})
+    (module,) = handler.collect(str(zig_file), OPTIONS)
+    html = handler.render([module], OPTIONS)
+
+    zig_file.write_text(ZIG_CODE.replace("return a + b;", "// Commutative.\n    return b + a;"), encoding="utf-8")
+    os.utime(zig_file, ns=(zig_file.stat().st_atime_ns, zig_file.stat().st_mtime_ns + 1_000_000))
+    handler = _make_handler(tmp_path)
+    handler._update_env(Markdown(), config={})
+    monkeypatch.setattr(handler.env.get_template("root.html.jinja"), "render", None)
+    (edited,) = handler.collect(str(zig_file), OPTIONS)
+    assert edited.children is module.children
+    assert edited.fingerprint == module.fingerprint
+    # Whole files are looked up by fingerprint, their docs are not serialized.
+    monkeypatch.setattr(handler_module, "_node_to_rows", None)
+    assert handler.render([edited], OPTIONS) == html
+
+
+def test_imported_doc_edits_render_importers_again(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Modules following imports are rendered again when the docs of the files they re-export from change."""
+    math_code = "/// Adds two numbers.\npub fn add(a: i32, b: i32) i32 {\n    return a + b;\n}\n"
+    root_code = 'pub const plus = @import("math.zig").add;\n'
+    _write_zig_files(tmp_path / "src", {"root.zig": root_code, "math.zig": math_code})
+    root = str(tmp_path / "src" / "root.zig")
+    options = ZigOptions.from_data(follow_imports=True)
+    monkeypatch.setattr(handler_module, "_rendered", {})
+
+    def _render() -> tuple[str, str]:
+        handler = _make_handler(tmp_path)
+        handler._update_env(Markdown(), config={})
+        (module,) = handler.collect(root, options)
+        return module.fingerprint, handler.render([module], options)
+
+    fingerprint, html = _render()
+    assert "Adds two numbers." in html
+    math_file = tmp_path / "src" / "math.zig"
+    math_file.write_text(math_code.replace("Adds", "Sums"), encoding="utf-8")
+    os.utime(math_file, ns=(math_file.stat().st_atime_ns, math_file.stat().st_mtime_ns + 1_000_000))
+    new_fingerprint, new_html = _render()
+    assert new_fingerprint != fingerprint
+    assert "Sums two numbers." in new_html
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("preload", [True, ["lib", "src/root.zig", "src/member.zig::Point.x", "missing.zig"]])
+def test_preload_identifiers_of_the_site(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    preload: bool | list[str],
+    jobs: int,
+) -> None:
+    """Preloaded identifiers are parsed before the first one is collected, later collections read the memo."""
+    _write_zig_files(
+        tmp_path,
+        {
+            "src/root.zig": ZIG_CODE,
+            "src/member.zig": ZIG_CODE,
+            "lib/a.zig": ZIG_CODE,
+            "lib/b.zig": ZIG_CODE,
+            "unused.zig": ZIG_CODE,
+        },
+    )
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "index.md").write_text(
+        "# API\n\n::: src/root.zig\n\n## ::: src/member.zig::Point.x\n    options:\n      heading_level: 3\n",
+        encoding="utf-8",
+    )
+    (docs_dir / "other.md").write_text("::: lib\n\n::: unused.zig\n    handler: python\n", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    expected = {
+        identifier: _make_handler(tmp_path).collect(identifier, OPTIONS)
+        for identifier in ("src/root.zig", "src/member.zig::Point.x", "lib")
+    }
+    handler_module._previous_extractors.clear()
+
+    handler = ZigHandler(
+        config=ZigConfig.from_data(preload=preload, jobs=jobs),
+        base_dir=tmp_path,
+        docs_dir=docs_dir,
+        theme="material",
+        custom_templates=None,
+        mdx=["toc"],
+        mdx_config={},
+    )
+    parsed_codes = []
+    extractor = handler._extractor
+
+    def _counting_extractor(code: str, **kwargs: Any) -> Any:
+        parsed_codes.append(code)
+        return extractor(code, **kwargs)
+
+    monkeypatch.setattr(handler, "_extractor", _counting_extractor)
+    try:
+        assert handler.collect("src/member.zig::Point.x", OPTIONS) == expected["src/member.zig::Point.x"]
+        assert len(handler._modules) == 4
+        assert Path("unused.zig").resolve() not in handler._modules
+        assert len(parsed_codes) == (4 if jobs == 1 else 0)
+        for identifier, modules in expected.items():
+            assert handler.collect(identifier, OPTIONS) == modules
+        assert len(parsed_codes) == (4 if jobs == 1 else 0)
+    finally:
+        handler.teardown()
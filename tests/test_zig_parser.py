@@ -1,9 +1,27 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from mkdocstrings_handlers.zig import Const, Field, Fields, Function, Module, Struct
+from mkdocstrings_handlers.zig._internal.nodes import (
+    _iter_dotted_names,
+    _iter_rendered_members,
+    _node_from_rows,
+    _node_to_rows,
+)
 from mkdocstrings_handlers.zig._internal.zig_docs_extractor import (
     _ZigDocsExtractor as ZigDocsExtractor,
 )
+from mkdocstrings_handlers.zig._internal.zig_docs_extractor import (
+    _ZigQueryDocsExtractor as ZigQueryDocsExtractor,
+)
 
+TEST_PROJECT_SOURCES = sorted((Path(__file__).parent.parent / "test_zig_project" / "src").glob("*.zig"))
 
-def test_parser() -> None:
+
+@pytest.mark.parametrize("extractor", [ZigDocsExtractor, ZigQueryDocsExtractor])
+def test_parser(extractor: type[ZigDocsExtractor]) -> None:
     zig_code = """
     //! This is module-level documentation
     //! It describes the entire file
@@ -43,82 +61,450 @@ def test_parser() -> None:
     }
     """
 
-    parsed = ZigDocsExtractor(zig_code).get_docs()
-    assert parsed == {
-        "doc": "This is module-level documentation\nIt describes the entire file",
-        "children": [
-            {
-                "node_type": "function",
-                "doc": "Adds two numbers.",
-                "name": "add",
-                "signature": "fn add(a: i32, b: i32) i32",
-                "short_signature": "fn add",
-            },
-            {
-                "node_type": "const",
-                "doc": "A constant named PI.",
-                "name": "PI",
-                "short_signature": "const PI",
-            },
-            {
-                "node_type": "struct",
-                "name": "Point",
-                "short_signature": "struct Point",
-                "doc": "A 2D point struct.",
-                "children": [
-                    {
-                        "node_type": "fields",
-                        "children": [
-                            {
-                                "doc": "horizontal coordinate",
-                                "name": "x",
-                                "type": "i32",
-                            },
-                            {
-                                "doc": "vertical coorinate",
-                                "name": "y",
-                                "type": "i32",
-                            },
+    parsed = extractor(zig_code).get_docs()
+    assert parsed == Module(
+        doc="This is module-level documentation\nIt describes the entire file",
+        children=[
+            Function(
+                doc="Adds two numbers.",
+                name="add",
+                signature="fn add(a: i32, b: i32) i32",
+                short_signature="fn add",
+            ),
+            Const(
+                doc="A constant named PI.",
+                name="PI",
+                short_signature="const PI",
+            ),
+            Struct(
+                name="Point",
+                short_signature="struct Point",
+                doc="A 2D point struct.",
+                children=[
+                    Fields(
+                        children=[
+                            Field(
+                                doc="horizontal coordinate",
+                                name="x",
+                                type="i32",
+                            ),
+                            Field(
+                                doc="vertical coorinate",
+                                name="y",
+                                type="i32",
+                            ),
                         ],
-                    },
-                    {
-                        "node_type": "const",
-                        "name": "zero",
-                        "doc": "The top-left position",
-                        "short_signature": "pub const zero: Point",
-                    },
+                    ),
+                    Const(
+                        name="zero",
+                        doc="The top-left position",
+                        short_signature="pub const zero: Point",
+                    ),
                 ],
-            },
-            {
-                "node_type": "function",
-                "name": "main",
-                "doc": "Main function",
-                "signature": "pub fn main() void",
-                "short_signature": "pub fn main",
-            },
-            {
-                "node_type": "function",
-                "name": "GenericStructure",
-                "doc": "Generic structure factory example",
-                "signature": "fn GenericStructure(comptime T: type) type",
-                "short_signature": "fn GenericStructure",
-                "return_struct": {
-                    "node_type": "struct",
-                    "name": "return_struct",
-                    "short_signature": "return struct",
-                    "children": [
-                        {
-                            "node_type": "fields",
-                            "children": [
-                                {
-                                    "doc": "Contained value",
-                                    "name": "value",
-                                    "type": "T",
-                                },
+            ),
+            Function(
+                name="main",
+                doc="Main function",
+                signature="pub fn main() void",
+                short_signature="pub fn main",
+            ),
+            Function(
+                name="GenericStructure",
+                doc="Generic structure factory example",
+                signature="fn GenericStructure(comptime T: type) type",
+                short_signature="fn GenericStructure",
+                return_struct=Struct(
+                    name="return_struct",
+                    short_signature="return struct",
+                    children=[
+                        Fields(
+                            children=[
+                                Field(
+                                    doc="Contained value",
+                                    name="value",
+                                    type="T",
+                                ),
                             ],
-                        },
+                        ),
                     ],
-                },
-            },
+                ),
+            ),
         ],
+    )
+
+
+INCREMENTAL_CODE = """
+//! Module docs
+const std = @import("std");
+
+/// A 2D point struct.
+const Point = struct {
+    /// horizontal coordinate
+    x: i32,
+    /// vertical coorinate
+    y: i32,
+};
+
+/// Adds two numbers.
+fn add(a: i32, b: i32) i32 {
+    return a + b;
+}
+
+/// A constant named PI.
+const PI = 3.14159;
+"""
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        ("return a + b;", "return b + a;"),
+        ("/// Adds two numbers.", "/// Sums two numbers.\n/// Really."),
+        ("    y: i32,\n", ""),
+        ("const PI", "pub const PI"),
+        ("//! Module docs", "//! Module docs\n\n/// Answer\nconst answer = 42;"),
+        ("fn add(", "fn add2("),
+        ("};\n\n/// Adds", "\n/// Adds"),
+        ("3.14159;\n", "3.14159;\n/// E\nconst E = 2.71828;\n"),
+    ],
+)
+def test_incremental_parse_matches_full_parse(old: str, new: str) -> None:
+    """Reparsing an edited file incrementally gives the same docs as parsing it from scratch."""
+    previous = ZigDocsExtractor(INCREMENTAL_CODE)
+    previous.get_docs()
+    edited = INCREMENTAL_CODE.replace(old, new, 1)
+    assert ZigDocsExtractor(edited, previous=previous).get_docs() == ZigDocsExtractor(edited).get_docs()
+
+
+def test_incremental_parse_reuses_untouched_declarations() -> None:
+    """Declarations outside of the edited range are not extracted again."""
+    previous = ZigDocsExtractor(INCREMENTAL_CODE)
+    old_docs = previous.get_docs()
+    new_docs = ZigDocsExtractor(INCREMENTAL_CODE.replace("a + b", "b + a"), previous=previous).get_docs()
+    assert new_docs is old_docs
+
+    # Docs are extracted again when their surface changes.
+    previous = ZigDocsExtractor(INCREMENTAL_CODE)
+    old_docs = previous.get_docs()
+    edited = INCREMENTAL_CODE.replace("/// Adds two", "/// Sums two")
+    new_docs = ZigDocsExtractor(edited, previous=previous).get_docs()
+    old_point, old_add, old_pi = old_docs.children
+    new_point, new_add, new_pi = new_docs.children
+    assert new_point is old_point
+    assert new_pi is old_pi
+    assert new_add is not old_add
+    assert new_add == ZigDocsExtractor(edited).get_docs().children[1]
+
+
+@pytest.mark.parametrize("extractor", [ZigDocsExtractor, ZigQueryDocsExtractor])
+@pytest.mark.parametrize(
+    ("old", "new", "same_surface"),
+    [
+        ("return a + b;", "return b + a;", True),
+        ("return a + b;", "// Regular comment.\n    return a + b;", True),
+        ("//! Module docs\n", "//! Module docs\n// Regular comment.\n", True),
+        ("/// Adds two numbers.", "/// Sums two numbers.", False),
+        ("//! Module docs", "//! Module documentation", False),
+        ("fn add(a: i32", "fn add(a: i64", False),
+        ("    x: i32,", "    x: u32,", False),
+        ("    /// vertical coorinate\n", "", False),
+        ("const PI = 3.14159;", "const PI = 3.0;", False),
+        ("/// A constant named PI.\n", "/// A constant named PI.\ntest {}\n", False),
+    ],
+)
+def test_fingerprint_covers_documented_surface(
+    extractor: type[ZigDocsExtractor],
+    old: str,
+    new: str,
+    same_surface: bool,
+) -> None:
+    """Only edits of the documented surface change the fingerprint, which is the same when reparsing."""
+    previous = extractor(INCREMENTAL_CODE)
+    fingerprint = previous.get_fingerprint()
+    old_docs = previous.get_docs()
+    edited = INCREMENTAL_CODE.replace(old, new, 1)
+    reparsed = extractor(edited, previous=previous)
+    assert reparsed.get_fingerprint() == extractor(edited).get_fingerprint()
+    assert (reparsed.get_fingerprint() == fingerprint) is same_surface
+    assert (reparsed.get_docs() is old_docs) is same_surface
+    assert reparsed.get_docs() == extractor(edited).get_docs()
+
+
+def test_fingerprint_covers_returned_structures() -> None:
+    """The structures returned by functions are part of the documented surface, unlike the rest of the bodies."""
+    code = """
+/// Generic structure factory.
+fn Generic(comptime T: type) type {
+    const unused = 1;
+    return struct {
+        /// Contained value
+        value: T,
+    };
+}
+"""
+    fingerprint = ZigDocsExtractor(code).get_fingerprint()
+    assert ZigDocsExtractor(code.replace("unused = 1", "unused = 2")).get_fingerprint() == fingerprint
+    assert ZigDocsExtractor(code.replace("Contained", "Wrapped")).get_fingerprint() != fingerprint
+
+
+def test_signatures_from_node_ranges() -> None:
+    """Signatures stop at the function body, even with braces or parentheses in parameter types."""
+    zig_code = """
+    /// Takes an anonymous struct.
+    pub fn configure(options: struct { size: u8 = 1 }) !void {
+        _ = options;
+    }
+
+    /// Declared elsewhere.
+    extern fn external(a: u8) void;
+
+    /// Tuple type.
+    pub const Pair: type = struct { u8, u8 };
+    """
+
+    configure, external, pair = ZigDocsExtractor(zig_code).get_docs().children
+    assert isinstance(configure, Function)
+    assert configure.signature == "pub fn configure(options: struct { size: u8 = 1 }) !void"
+    assert configure.short_signature == "pub fn configure"
+    assert isinstance(external, Function)
+    assert external.signature == "extern fn external(a: u8) void"
+    assert external.short_signature == "extern fn external"
+    assert isinstance(pair, Struct)
+    assert pair.short_signature == "pub struct Pair: type"
+
+
+def test_doc_comments_attach_to_next_member() -> None:
+    """Doc comments go to the next member, regular comments don't interrupt them but declarations do."""
+    zig_code = """
+    /// Lost, the import below takes it.
+    const std = @import("std");
+    /// First line.
+    // Not documentation.
+    /// Second line.
+    const documented = 1;
+    const undocumented = 2;
+    """
+
+    assert ZigDocsExtractor(zig_code).get_docs().children == [
+        Const(
+            name="documented",
+            doc="First line.\nSecond line.",
+            short_signature="const documented",
+        ),
+    ]
+
+
+def _synthetic_source(count: int) -> str:
+    parts = ["//! Synthetic module\n", 'const std = @import("std");\n']
+    for index in range(count):
+        parts.append(f"""
+/// Structure number {index}.
+/// Second line, with `code`.
+pub const Struct{index} = struct {{
+    /// First field
+    first: u32,
+    // Regular comment.
+    /// Second field
+    second: [2]u8 = .{{ 0, 0 }},
+    comptime third: u8 = 3,
+    undocumented: bool,
+
+    /// Nested structure
+    const Nested = struct {{
+        /// Value
+        value: ?*Struct{index},
+    }};
+
+    /// Method {index}
+    pub fn method(self: *Struct{index}, options: struct {{ flag: bool }}) !void {{
+        _ = self;
+        _ = options;
+    }}
+}};
+
+/// Generic factory {index}
+pub fn Factory{index}(comptime T: type) type {{
+    if (T == void) return struct {{}};
+    return struct {{
+        /// Wrapped value
+        value: T,
+    }};
+}}
+
+test "struct {index}" {{}}
+/// Constant {index}
+pub const constant{index}: u32 = {index};
+""")
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("path", TEST_PROJECT_SOURCES, ids=lambda path: path.name)
+def test_query_engine_parity_on_project(path: Path) -> None:
+    """Both extraction engines give the same docs for the test Zig project."""
+    code = path.read_text(encoding="utf-8")
+    assert ZigQueryDocsExtractor(code).get_docs() == ZigDocsExtractor(code).get_docs()
+
+
+def test_query_engine_parity_on_synthetic_corpus() -> None:
+    """Both extraction engines give the same docs for a large generated file."""
+    code = _synthetic_source(200)
+    docs = ZigDocsExtractor(code).get_docs()
+    assert len(docs.children) == 600
+    assert ZigQueryDocsExtractor(code).get_docs() == docs
+
+
+def test_query_engine_parity_with_syntax_errors() -> None:
+    """The query engine falls back to the walk on trees with syntax errors."""
+    code = _synthetic_source(3).replace("undocumented: bool,", "undocumented: bool,,", 1)
+    assert ZigQueryDocsExtractor(code).get_docs() == ZigDocsExtractor(code).get_docs()
+
+
+def _deeply_nested_source(depth: int) -> str:
+    # Each level declares a structure, with a function returning a structure which holds the next level.
+    opening = "".join(
+        f"/// Level {level}.\npub const Level{level} = struct {{\n"
+        "/// Factory.\npub fn Make() type {\n"
+        f"return struct {{\n/// Value {level}.\nvalue: u32,\n"
+        for level in range(depth)
+    )
+    return opening + "};\n}\n};\n" * depth
+
+
+@pytest.mark.parametrize("extractor", [ZigDocsExtractor, ZigQueryDocsExtractor])
+def test_deeply_nested_structures(extractor: type[ZigDocsExtractor]) -> None:
+    """Structures nested deeper than the recursion limit are extracted with the same shape as shallow ones."""
+    depth = 2 * sys.getrecursionlimit()
+    code = _deeply_nested_source(depth)
+    parsed = extractor(code)
+    assert not parsed.tree.root_node.has_error
+
+    # Docs are compared level by level, comparing them at once would exceed the recursion limit.
+    children = parsed.get_docs().children
+    for level in range(depth):
+        (struct,) = children
+        assert isinstance(struct, Struct)
+        assert (struct.name, struct.short_signature, struct.doc) == (
+            f"Level{level}",
+            f"pub struct Level{level}",
+            f"Level {level}.",
+        )
+        (factory,) = struct.children
+        assert isinstance(factory, Function)
+        assert factory.return_struct is not None
+        fields, *children = factory.return_struct.children
+        assert fields == Fields(children=[Field(name="value", type="u32", doc=f"Value {level}.")])
+    assert not children
+
+    member = parsed.get_member_docs("Level0")
+    assert isinstance(member, Struct)
+    assert member.name == "Level0"
+
+    # Conversions of the docs are not recursive either.
+    docs = parsed.get_docs()
+    rows = _node_to_rows(docs)
+    assert _node_to_rows(_node_from_rows(rows)) == rows
+    rendered = list(_iter_rendered_members(docs.children, 1, ""))
+    assert max(level for _, level, _, _ in rendered) == 3 * depth + 1
+    # Structures and functions are closed after their nested members, innermost first.
+    opened: list[object] = []
+    for member, _, _, closing in rendered:
+        if closing:
+            assert opened.pop() is member
+        elif isinstance(member, (Struct, Function)):
+            opened.append(member)
+    assert not opened
+    assert len(list(_iter_dotted_names(docs.children))) == 4 * depth
+    edited = code.replace(f"/// Value {depth - 1}.", "/// Innermost value.")
+    assert extractor(edited).get_fingerprint() != parsed.get_fingerprint()
+
+
+@pytest.mark.parametrize("extractor", [ZigDocsExtractor, ZigQueryDocsExtractor])
+def test_huge_container(extractor: type[ZigDocsExtractor]) -> None:
+    """A structure with a hundred thousand declarations is extracted entirely."""
+    count = 50_000
+    code = (
+        "pub const Huge = struct {\n"
+        + "".join(
+            f"/// Field {index}.\nfield{index}: u32,\n/// Constant {index}.\npub const constant{index} = {index};\n"
+            for index in range(count)
+        )
+        + "};\n"
+    )
+    (huge,) = extractor(code).get_docs().children
+    assert isinstance(huge, Struct)
+    fields, *constants = huge.children
+    assert isinstance(fields, Fields)
+    assert len(fields.children) == len(constants) == count
+    last = count - 1
+    assert fields.children[last] == Field(name=f"field{last}", type="u32", doc=f"Field {last}.")
+    assert constants[last] == Const(
+        name=f"constant{last}",
+        short_signature=f"pub const constant{last}",
+        doc=f"Constant {last}.",
+    )
+
+
+@pytest.mark.parametrize("extractor", [ZigDocsExtractor, ZigQueryDocsExtractor])
+def test_member_docs_match_module_docs(extractor: type[ZigDocsExtractor]) -> None:
+    """Docs of a single declaration are the same as in the docs of the whole module."""
+    code = _synthetic_source(5)
+    docs = extractor(code).get_docs()
+    struct = docs.children[6]
+    assert isinstance(struct, Struct)
+    assert struct.name == "Struct2"
+    fields, nested, method = struct.children
+    assert isinstance(fields, Fields)
+    assert isinstance(nested, Struct)
+
+    extracted = extractor(code)
+    assert extracted.get_member_docs("Struct2") == struct
+    assert extracted.get_member_docs("Struct2.method") == method
+    assert extracted.get_member_docs("Struct2.Nested") == nested
+    assert extracted.get_member_docs("Struct2.Nested.value") == nested.children[0]
+    assert extracted.get_member_docs("Struct2.second") == Fields(children=[fields.children[1]])
+    assert extracted.get_member_docs("constant4") == docs.children[-1]
+
+
+@pytest.mark.parametrize(
+    "qualified_name",
+    ["Missing", "Struct0.missing", "constant0.value", "Struct0.undocumented", "Factory0.value"],
+)
+def test_member_docs_not_found(qualified_name: str) -> None:
+    """Unknown or undocumented declarations give no docs."""
+    assert ZigDocsExtractor(_synthetic_source(1)).get_member_docs(qualified_name) is None
+
+
+def test_imports_and_root_source_files() -> None:
+    """Imports of files are found anywhere in the file, and root source files in build scripts."""
+    extractor = ZigDocsExtractor("""
+    const std = @import("std");
+    const util = @import("util.zig");
+    const data = @embedFile("data.zig");
+
+    pub fn build(b: *std.Build) void {
+        _ = b.createModule(.{ .root_source_file = b.path("src/root.zig"), .target = @import("sub/target.zig").x });
     }
+    """)
+    assert extractor.get_imports() == ["util.zig", "sub/target.zig"]
+    assert extractor.get_root_source_files() == ["src/root.zig"]
+
+    build_script = (Path(__file__).parent.parent / "test_zig_project" / "build.zig").read_text(encoding="utf-8")
+    assert ZigDocsExtractor(build_script).get_root_source_files() == ["src/root.zig", "src/main.zig"]
+
+
+@pytest.mark.parametrize("extractor", [ZigDocsExtractor, ZigQueryDocsExtractor])
+def test_reexports(extractor: type[ZigDocsExtractor]) -> None:
+    """Public declarations bound to imported files or their declarations are re-exports."""
+    reexports = extractor("""
+    const std = @import("std");
+    /// Utilities.
+    pub const util = @import("util.zig");
+    // Not a doc comment.
+    pub const Point = @import("geometry.zig").shapes.Point;
+    const private = @import("private.zig");
+    pub const mem = @import("std").mem;
+    """).get_reexports()
+    assert [tuple(reexport) for reexport in reexports] == [
+        ("util", "pub const util", "Utilities.", "util.zig", ""),
+        ("Point", "pub const Point", "", "geometry.zig", "shapes.Point"),
+    ]